@@ -13,8 +13,13 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import collections
 import logging
 import os
+import threading
+import typing
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pandas as pd
@@ -31,6 +36,14 @@ __all__ = ("VerticalConcatenationPrimitive",)
 
 logger = logging.getLogger(__name__)
 
+# dataset metadata generated for previously seen output schemas - generation is only run over a
+# single row and produces column level information, so it can be shared between calls
+_METADATA_CACHE: "collections.OrderedDict[typing.Tuple, metadata_base.DataMetadata]" = (
+    collections.OrderedDict()
+)
+_METADATA_CACHE_SIZE = 32
+_METADATA_CACHE_LOCK = threading.Lock()
+
 
 class Hyperparams(hyperparams.Hyperparams):
     remove_duplicate_rows = hyperparams.Hyperparameter[bool](
@@ -48,6 +61,13 @@ class Hyperparams(hyperparams.Hyperparams):
         ],
         description="The logic to concat two dataframes.",
     )
+    arrow_backed = hyperparams.Hyperparameter[bool](
+        default=False,
+        semantic_types=[
+            "https://metadata.datadrivendiscovery.org/types/ControlParameter"
+        ],
+        description="If True, inputs are converted to pyarrow backed dtypes so column chunks are stitched together rather than copied. Requires pandas>=2.0 and pyarrow.",
+    )
 
 
 class VerticalConcatenationPrimitive(
@@ -86,50 +106,368 @@ class VerticalConcatenationPrimitive(
         },
     )
 
+    def __init__(self, *, hyperparams: Hyperparams, random_seed: int = 0) -> None:
+        super().__init__(hyperparams=hyperparams, random_seed=random_seed)
+
+        # main resource ids of previously seen dataset inputs keyed by id() - the weak reference
+        # drops the entry along with its dataset
+        self._resource_ids: typing.Dict[int, typing.Tuple[weakref.ref, str]] = {}
+
     def produce(
         self, *, inputs: container.List, timeout: float = None, iterations: int = None
     ) -> base.CallResult[container.Dataset]:
-        # build the list of dataframes from the list of inputs
-        dataframes = []
-        metadata = None
-        for input in inputs:
-            if isinstance(input, container.DataFrame):
-                dataframes.append(input)
-            try:
-                _, main_dr = d3m_base_utils.get_tabular_resource(input, None)
-                dataframes.append(main_dr)
-                metadata = input.metadata
-            except ValueError as error:
-                raise exceptions.InvalidArgumentValueError(
-                    "Failure to find tabular resource in dataset"
-                ) from error
+        # build the list of dataframes from the list of inputs - order is kept since it decides
+        # which row wins when duplicates are removed
+        dataframes = [self._get_dataframe(input) for input in inputs]
+
+        # reuse the metadata of the last dataset input, if there is one
+        datasets = [input for input in inputs if isinstance(input, container.Dataset)]
+        metadata = datasets[-1].metadata if len(datasets) > 0 else None
+
+        if len(dataframes) == 1:
+            logger.info(
+                "Only one input provided, the output is a copy of it with duplicate rows "
+                "removed if enabled"
+            )
 
-        if self.hyperparams["column_overlap"] == "exact":
+        column_overlap = self.hyperparams["column_overlap"]
+        if column_overlap == "exact" and len(dataframes) > 1:
             columns_to_handle = dataframes[0].columns
-            if np.sum(
-                np.array([np.all(df.columns == columns_to_handle) for df in dataframes])
-            ) != len(dataframes):
+            if not all(df.columns.equals(columns_to_handle) for df in dataframes):
                 raise exceptions.InvalidArgumentValueError(
                     "Dataframes don't have same columns, cannot exact concat"
                 )
-            concated = pd.concat(dataframes, ignore_index=True)
-        elif self.hyperparams["column_overlap"] == "union":
-            concated = pd.concat(dataframes, ignore_index=True)
-        elif self.hyperparams["column_overlap"] == "intersection":
-            concated = pd.concat(dataframes, join="inner", ignore_index=True)
 
+        # flag duplicates ahead of the concat so they're never copied into the result
+        keep = None
         if self.hyperparams["remove_duplicate_rows"]:
-            concated.drop_duplicates(
-                subset="d3mIndex", keep="first", inplace=True, ignore_index=True
-            )
+            keep = self._keep_masks(dataframes)
+
+        if self.hyperparams["arrow_backed"]:
+            try:
+                dataframes = [
+                    df.convert_dtypes(dtype_backend="pyarrow") for df in dataframes
+                ]
+            except (TypeError, ImportError) as error:
+                raise exceptions.InvalidArgumentValueError(
+                    "Arrow backed concat requires pandas>=2.0 and pyarrow"
+                ) from error
+
+        # reduce every frame to the shared columns up front so concat has nothing to align, and
+        # frames with matching dtypes can take the preallocated path
+        if column_overlap == "intersection":
+            common = dataframes[0].columns
+            for df in dataframes[1:]:
+                common = common.intersection(df.columns, sort=False)
+            dataframes = [
+                df if df.columns.equals(common) else df[common] for df in dataframes
+            ]
+
+        # the output length is known from the duplicate masks, so the metadata doesn't need to
+        # wait on the concatenated frame for it
+        n_rows = sum(self._row_counts(dataframes, keep))
 
+        if metadata is None:
+            # metadata generation only looks at the output schema and first row, so run it on a one
+            # row template in the background while the full concat copies the data - the first row
+            # of the first frame is never a duplicate, so the template's first row is the output's
+            template = self._concat([df.head(1) for df in dataframes]).head(1)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(self._generate_metadata, template, n_rows)
+                concated = self._concat(dataframes, keep)
+                metadata = future.result()
+        else:
+            concated = self._concat(dataframes, keep)
+        metadata = self._set_length(metadata, n_rows)
+        outputs = container.Dataset({"learningData": concated}, metadata)
+
+        return base.CallResult(outputs)
+
+    def _get_dataframe(
+        self, input: typing.Union[container.DataFrame, container.Dataset]
+    ) -> container.DataFrame:
+        if isinstance(input, container.DataFrame):
+            return input
+
+        # pipelines commonly call produce with the same datasets, so reuse the entry point lookup
+        # as long as the resource is still there
+        key = id(input)
+        cached = self._resource_ids.get(key, None)
+        if cached is not None and cached[0]() is input and cached[1] in input:
+            return input[cached[1]]
+
+        try:
+            resource_id, main_dr = d3m_base_utils.get_tabular_resource(input, None)
+        except ValueError as error:
+            raise exceptions.InvalidArgumentValueError(
+                "Failure to find tabular resource in dataset"
+            ) from error
+        self._resource_ids[key] = (
+            weakref.ref(input, lambda _: self._resource_ids.pop(key, None)),
+            resource_id,
+        )
+        return main_dr
+
+    @classmethod
+    def _generate_metadata(
+        cls, dataframe: pd.DataFrame, n_rows: int
+    ) -> metadata_base.DataMetadata:
+        key = cls._schema_key(dataframe)
+        with _METADATA_CACHE_LOCK:
+            metadata = _METADATA_CACHE.get(key)
         if metadata is None:
             metadata = container.Dataset(
-                {"learningData": concated.head(1)}, generate_metadata=True
+                {"learningData": dataframe.head(1)}, generate_metadata=True
             ).metadata
-        outputs = container.Dataset({"learningData": concated}, metadata)
-        outputs.metadata = outputs.metadata.update(
-            (metadata_base.ALL_ELEMENTS,), {"dimension": {"length": concated.shape[0]}}
+        # store the metadata with its length already set so a repeat call with the same number
+        # of rows doesn't need another update
+        metadata = cls._set_length(metadata, n_rows)
+        with _METADATA_CACHE_LOCK:
+            _METADATA_CACHE[key] = metadata
+            _METADATA_CACHE.move_to_end(key)
+            if len(_METADATA_CACHE) > _METADATA_CACHE_SIZE:
+                _METADATA_CACHE.popitem(last=False)
+        return metadata
+
+    @classmethod
+    def _set_length(
+        cls, metadata: metadata_base.DataMetadata, length: int
+    ) -> metadata_base.DataMetadata:
+        # metadata is copy on write, so skip the update when the recorded length is already right
+        dimension = metadata.query(("learningData",)).get("dimension", {})
+        if dimension.get("length", None) == length:
+            return metadata
+        return metadata.update(
+            (metadata_base.ALL_ELEMENTS,), {"dimension": {"length": length}}
         )
 
-        return base.CallResult(outputs)
+    @classmethod
+    def _schema_key(cls, dataframe: pd.DataFrame) -> typing.Tuple:
+        # column names and dtypes, plus the type of the first value for object columns since
+        # that's what structural type generation inspects
+        key = []
+        for col_idx, (col, dtype) in enumerate(dataframe.dtypes.items()):
+            value_type = None
+            if dtype == object and dataframe.shape[0] > 0:
+                value_type = type(dataframe.iat[0, col_idx])
+            key.append((col, str(dtype), value_type))
+        return tuple(key)
+
+    @classmethod
+    def _keep_masks(
+        cls, dataframes: typing.Sequence[pd.DataFrame]
+    ) -> typing.List[typing.Optional[np.ndarray]]:
+        # flag repeated d3mIndex values across all frames in input order (first occurrence is
+        # retained) and split the flags back out per frame, with None marking a frame that has
+        # nothing to drop - only the index column is ever concatenated
+        keys = [df["d3mIndex"] for df in dataframes]
+        if cls._keys_disjoint(keys):
+            return [None] * len(dataframes)
+
+        keep = ~cls._duplicated_keys(keys)
+        offsets = np.cumsum([0] + [df.shape[0] for df in dataframes])
+
+        masks = []
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            mask = keep[start:end]
+            masks.append(None if mask.all() else mask)
+        return masks
+
+    @classmethod
+    def _keys_disjoint(cls, keys: typing.Sequence[pd.Series]) -> bool:
+        # cheap check for the common batch/append pattern - if every frame's numeric index is
+        # strictly increasing and the frames cover non-overlapping ranges there can't be any
+        # duplicates, so the hashing pass can be skipped
+        ranges = []
+        for k in keys:
+            if not pd.api.types.is_numeric_dtype(k.dtype):
+                return False
+            values = k.to_numpy()
+            if values.shape[0] == 0:
+                continue
+            if not np.all(values[1:] > values[:-1]):
+                return False
+            ranges.append((values[0], values[-1]))
+        ranges.sort()
+        return all(
+            prev_max < next_min
+            for (_, prev_max), (next_min, _) in zip(ranges[:-1], ranges[1:])
+        )
+
+    @classmethod
+    def _duplicated_keys(cls, keys: typing.Sequence[pd.Series]) -> np.ndarray:
+        # int64 keys (the usual d3mIndex case) are stacked as raw arrays and resolved with a
+        # single numpy sort - unique's return_index gives the first occurrence of every value.
+        # anything else goes through pandas so mixed dtypes are resolved the same way concat
+        # would resolve them
+        if all(k.dtype == np.int64 for k in keys):
+            stacked = np.concatenate([k.to_numpy() for k in keys])
+            _, first = np.unique(stacked, return_index=True)
+            duplicated = np.ones(stacked.shape[0], dtype=bool)
+            duplicated[first] = False
+            return duplicated
+        stacked = pd.concat(keys, ignore_index=True)
+        return stacked.duplicated(keep="first").to_numpy()
+
+    @classmethod
+    def _row_counts(
+        cls,
+        dataframes: typing.Sequence[pd.DataFrame],
+        keep: typing.Optional[typing.Sequence[typing.Optional[np.ndarray]]] = None,
+    ) -> typing.List[int]:
+        if keep is None:
+            keep = [None] * len(dataframes)
+        return [
+            df.shape[0] if mask is None else int(np.count_nonzero(mask))
+            for df, mask in zip(dataframes, keep)
+        ]
+
+    @classmethod
+    def _concat(
+        cls,
+        dataframes: typing.Sequence[pd.DataFrame],
+        keep: typing.Optional[typing.Sequence[typing.Optional[np.ndarray]]] = None,
+    ) -> pd.DataFrame:
+        if keep is None:
+            keep = [None] * len(dataframes)
+        if len(dataframes) == 1:
+            return cls._single_frame(dataframes[0], keep[0])
+        dtypes = cls._output_dtypes(dataframes)
+        if dtypes is not None:
+            return cls._concat_preallocated(dataframes, keep, dtypes)
+        if cls._same_schema(dataframes):
+            return cls._concat_arrays(dataframes, keep)
+        dataframes = [
+            df if mask is None else df[mask] for df, mask in zip(dataframes, keep)
+        ]
+        dataframes = cls._unify_categoricals(dataframes)
+        # ignore_index builds the output RangeIndex from the total length alone, without touching
+        # the input indexes - relabelling the inputs so a plain concat appends them costs more
+        return pd.concat(dataframes, ignore_index=True, copy=False)
+
+    @classmethod
+    def _single_frame(
+        cls, dataframe: pd.DataFrame, mask: typing.Optional[np.ndarray]
+    ) -> pd.DataFrame:
+        # nothing to concatenate - hand back a copy of the frame, dropping duplicates and
+        # resetting the index when it isn't already the default one.  the output is never the
+        # input itself, so later in place changes downstream can't reach the caller's frame
+        if mask is not None:
+            dataframe = dataframe[mask]
+        else:
+            dataframe = dataframe.copy()
+        index = dataframe.index
+        if not (
+            isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1
+        ):
+            dataframe = dataframe.reset_index(drop=True)
+        return dataframe
+
+    @classmethod
+    def _same_schema(cls, dataframes: typing.Sequence[pd.DataFrame]) -> bool:
+        columns = dataframes[0].columns
+        dtypes = dataframes[0].dtypes
+        return columns.is_unique and all(
+            df.columns.equals(columns) and df.dtypes.equals(dtypes)
+            for df in dataframes[1:]
+        )
+
+    @classmethod
+    def _concat_arrays(
+        cls,
+        dataframes: typing.Sequence[pd.DataFrame],
+        keep: typing.Sequence[typing.Optional[np.ndarray]],
+    ) -> container.DataFrame:
+        # identical schemas that include extension dtypes (arrow backed inputs in particular) -
+        # concat column by column so each array type joins its own chunks, which for arrow just
+        # stitches the chunk lists together instead of copying into new blocks
+        data = {}
+        for col in dataframes[0].columns:
+            columns = [
+                df[col] if mask is None else df[col][mask]
+                for df, mask in zip(dataframes, keep)
+            ]
+            data[col] = pd.concat(columns, ignore_index=True, copy=False)
+        return container.DataFrame(data, copy=False)
+
+    @classmethod
+    def _unify_categoricals(
+        cls, dataframes: typing.Sequence[pd.DataFrame]
+    ) -> typing.List[pd.DataFrame]:
+        # pandas falls back to object dtype when concatenating categoricals with different
+        # categories - give them a shared category set first so the concat stays categorical and
+        # only appends integer codes
+        unified = list(dataframes)
+        for col in dataframes[0].columns:
+            dtypes = [df[col].dtype if col in df.columns else None for df in dataframes]
+            if not all(
+                isinstance(dtype, pd.CategoricalDtype) and not dtype.ordered
+                for dtype in dtypes
+            ) or all(dtype == dtypes[0] for dtype in dtypes[1:]):
+                continue
+            categories = dtypes[0].categories
+            for dtype in dtypes[1:]:
+                categories = categories.union(dtype.categories, sort=False)
+            shared_dtype = pd.CategoricalDtype(categories)
+            for i, df in enumerate(unified):
+                df = df.copy(deep=False)
+                df[col] = df[col].astype(shared_dtype)
+                unified[i] = df
+        return unified
+
+    @classmethod
+    def _output_dtypes(
+        cls, dataframes: typing.Sequence[pd.DataFrame]
+    ) -> typing.Optional[typing.Dict[typing.Any, np.dtype]]:
+        # the output columns (in order of appearance) and their dtypes when the concat can be done
+        # by filling preallocated numpy buffers - None otherwise.  every frame's columns need to be
+        # unique and numpy backed, a column needs the same dtype in every frame that holds it, and a
+        # column missing from some frame has to be able to hold NaN without pandas upcasting it
+        if len(dataframes) == 0:
+            return None
+        dtypes: typing.Dict[typing.Any, np.dtype] = {}
+        for df in dataframes:
+            if not df.columns.is_unique:
+                return None
+            for col, dtype in df.dtypes.items():
+                if not isinstance(dtype, np.dtype) or dtypes.setdefault(col, dtype) != dtype:
+                    return None
+        for col, dtype in dtypes.items():
+            if dtype not in (np.float64, object) and not all(
+                col in df.columns for df in dataframes
+            ):
+                return None
+        return dtypes
+
+    @classmethod
+    def _concat_preallocated(
+        cls,
+        dataframes: typing.Sequence[pd.DataFrame],
+        keep: typing.Sequence[typing.Optional[np.ndarray]],
+        dtypes: typing.Dict[typing.Any, np.dtype],
+    ) -> container.DataFrame:
+        # each output column is allocated once and every frame's kept rows are written straight
+        # into their slice of it (NaN where the frame doesn't have the column) - this skips the
+        # alignment and casting pandas does in concat, never builds intermediate deduplicated
+        # frames, and preserves the d3mIndex dtype
+        offsets = np.cumsum([0] + cls._row_counts(dataframes, keep))
+
+        def fill(col: typing.Any) -> np.ndarray:
+            buffer = np.empty(offsets[-1], dtype=dtypes[col])
+            for df, mask, start, end in zip(
+                dataframes, keep, offsets[:-1], offsets[1:]
+            ):
+                if col not in df.columns:
+                    buffer[start:end] = np.nan
+                elif mask is None:
+                    buffer[start:end] = df[col].to_numpy()
+                else:
+                    np.compress(mask, df[col].to_numpy(), out=buffer[start:end])
+            return buffer
+
+        # columns are independent and numpy releases the GIL while copying, so fill them in parallel
+        columns = list(dtypes.keys())
+        max_workers = max(1, min(len(columns), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            data = dict(zip(columns, executor.map(fill, columns)))
+        return container.DataFrame(data, copy=False)
@@ -16,21 +16,20 @@
 import typing
 import os
 import collections
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd  # type: ignore
 import numpy as np
 
-import haversine as hs
-
 from joblib import Parallel, delayed
+from scipy import spatial
 
 from d3m import container, exceptions, utils as d3m_utils
 from d3m.base import utils as d3m_base_utils
 from d3m.metadata import base as metadata_base, hyperparams
 from d3m.primitive_interfaces import base, transformer
-from rapidfuzz import process
-from haversine import Unit
-from dateutil import parser
+from rapidfuzz import fuzz, process, utils as fuzz_utils
+from haversine import Unit, haversine_vector
 import version
 
 __all__ = ("FuzzyJoinPrimitive",)
@@ -180,6 +179,17 @@ class FuzzyJoinPrimitive(
 
     _DATETIME_JOIN_TYPES = set(("http://schema.org/DateTime",))
 
+    # number of left keys scored against the right side at a time - bounds the pairwise score and
+    # distance matrices to tile size * right size
+    _MATCH_TILE_SIZE = 4096
+
+    # right sides with at most this many vectors are matched by brute force rather than through a
+    # KD tree, which costs more to build than it saves at that size
+    _SMALL_CHOICE_COUNT = 256
+
+    # left string columns with at least this fraction of distinct values are matched row by row
+    _UNIQUE_KEY_RATIO = 0.9
+
     _SUPPORTED_TYPES = (
         _STRING_JOIN_TYPES.union(_NUMERIC_JOIN_TYPES)
         .union(_DATETIME_JOIN_TYPES)
@@ -300,15 +310,31 @@ class FuzzyJoinPrimitive(
             accuracy = [accuracy]
             absolute_accuracy = [absolute_accuracy]
 
+        # look up column positions by name once per dataset rather than once per join column
+        left_indices = self._get_column_indices(left, left_resource_id)
+        right_indices = self._get_column_indices(right, right_resource_id)
         join_types = [
             self._get_join_semantic_type(
                 left,
                 left_resource_id,
                 left_col[i],
+                left_indices,
                 right,
                 right_resource_id,
                 right_col[i],
+                right_indices,
+            )
+            for i in range(len(left_col))
+        ]
+
+        # datetime tolerances are based on the time range of the whole left column, so work them
+        # out once here rather than re-parsing the full column in every split
+        datetime_tolerances = [
+            self._compute_datetime_tolerance(
+                left_df, left_col[i], right_df, right_col[i], accuracy[i]
             )
+            if len(self._DATETIME_JOIN_TYPES.intersection(join_types[i])) > 0
+            else None
             for i in range(len(left_col))
         ]
 
@@ -317,14 +343,14 @@ class FuzzyJoinPrimitive(
         left_df_split = np.array_split(left_df, num_splits)
         jobs = [delayed(self._produce_threaded)(
             index = i,
-            left_df_full = left_df,
             left_dfs = left_df_split,
             right_df = right_df,
             join_types = join_types,
             left_col = left_col,
             right_col = right_col,
             accuracy = accuracy,
-            absolute_accuracy = absolute_accuracy
+            absolute_accuracy = absolute_accuracy,
+            datetime_tolerances = datetime_tolerances
         ) for i in range(num_splits)]
         joined_data = Parallel(n_jobs=self.hyperparams["n_jobs"], backend="loky", verbose=10)(jobs)
 
@@ -338,26 +364,33 @@ class FuzzyJoinPrimitive(
         float_vector_columns = {}
         for resource_id, resource in left.items():  # type: ignore
             if resource_id == left_resource_id:
-                for column in joined.columns:
-                    # need to avoid bug in container.Dataset, it doesn't like vector columns
-                    if type(joined[column].iloc[0]) == np.ndarray:
+                # need to avoid bug in container.Dataset, it doesn't like vector columns - only
+                # object columns can hold arrays, so only those need their first value checked
+                for column in joined.columns[(joined.dtypes == object).to_numpy()]:
+                    if joined.shape[0] > 0 and isinstance(
+                        joined[column].iat[0], np.ndarray
+                    ):
                         float_vector_columns[column] = joined[column]
                         joined[column] = np.NAN
                 resource_map[resource_id] = joined
             else:
                 resource_map[resource_id] = resource
 
-        # Generate metadata for the dataset using only the first row of the resource for speed -
-        # metadata generation runs over each cell in the dataframe, but we only care about column
-        # level generation.  Once that's done, set the actual dataframe value.
-        result_dataset = container.Dataset(
-            {k: v.head(1) for k, v in resource_map.items()}, generate_metadata=True
+        # Generate metadata for the joined resource using only its first row for speed - metadata
+        # generation runs over each cell in the dataframe, but we only care about column level
+        # generation.  The other resources aren't changed by the join, so their metadata is
+        # carried over from the left dataset rather than generated again.
+        joined_metadata = container.Dataset(
+            {left_resource_id: joined.head(1)}, generate_metadata=True
+        ).metadata
+        metadata = left.metadata.remove((left_resource_id,), recursive=True)
+        metadata = joined_metadata.copy_to(
+            metadata, (left_resource_id,), (left_resource_id,)
         )
-        for k, v in resource_map.items():
-            result_dataset[k] = v
-            result_dataset.metadata = result_dataset.metadata.update(
-                (k,), {"dimension": {"length": v.shape[0]}}
-            )
+        metadata = metadata.update(
+            (left_resource_id,), {"dimension": {"length": joined.shape[0]}}
+        )
+        result_dataset = container.Dataset(resource_map, metadata)
 
         for key in float_vector_columns.keys():
             df = result_dataset[left_resource_id]
@@ -378,136 +411,128 @@ class FuzzyJoinPrimitive(
         self,
         *,
         index: int,
-        left_df_full: container.DataFrame, # type: ignore
         left_dfs: typing.Sequence[container.DataFrame],  # type: ignore
         right_df: container.DataFrame,  # type: ignore
         join_types: typing.Sequence[str],
         left_col: typing.Sequence[int],
         right_col: typing.Sequence[int],
         accuracy: typing.Sequence[float],
-        absolute_accuracy: typing.Sequence[bool]
+        absolute_accuracy: typing.Sequence[bool],
+        datetime_tolerances: typing.Sequence[typing.Optional[np.timedelta64]]
     ) -> typing.Tuple[int, base.CallResult[Outputs]]:
         if left_dfs[index].empty:
             return (index, None)
         output = self._produce(
-            left_df_full = left_df_full,
             left_df = left_dfs[index].reset_index(drop=True),
             right_df = right_df.copy(),
             join_types = join_types,
             left_col = left_col,
             right_col = right_col,
             accuracy = accuracy,
-            absolute_accuracy = absolute_accuracy
+            absolute_accuracy = absolute_accuracy,
+            datetime_tolerances = datetime_tolerances
         )
         return (index, output)
 
     def _produce(
         self,
         *,
-        left_df_full: container.DataFrame, # type: ignore
         left_df: container.DataFrame,  # type: ignore
         right_df: container.DataFrame,  # type: ignore
         join_types: typing.Sequence[str],
         left_col: typing.Sequence[int],
         right_col: typing.Sequence[int],
         accuracy: typing.Sequence[float],
-        absolute_accuracy: typing.Sequence[bool]
+        absolute_accuracy: typing.Sequence[bool],
+        datetime_tolerances: typing.Sequence[typing.Optional[np.timedelta64]]
     ) -> base.CallResult[Outputs]:
 
         # cycle through the columns to join the dataframes
         right_cols_to_drop = []
         new_left_cols = []
         new_right_cols = []
+        exact_left_cols = []
+        left_pieces = []
+        right_pieces = []
+
+        # the right d3mIndex is dropped from the result anyway, so don't carry it through the
+        # column matching unless it's being joined on
+        if "d3mIndex" in right_df.columns and "d3mIndex" not in right_col:
+            right_df.drop(columns=["d3mIndex"], inplace=True)
+
+        # exact joins need no matching, so decide those up front against the original right columns
+        exact_joins = [
+            self._is_exact_join(
+                join_types[col_index],
+                left_df[left_col[col_index]],
+                right_df[right_col[col_index]],
+                accuracy[col_index],
+                absolute_accuracy[col_index],
+            )
+            for col_index in range(len(left_col))
+        ]
+
+        # the fuzzy matching for each join column doesn't depend on the others and spends most of
+        # its time in numpy / rapidfuzz code that releases the GIL, so build the merge columns
+        # concurrently and then assemble them in column order
+        def build(col_index: int) -> typing.Tuple[pd.DataFrame, pd.DataFrame]:
+            return self._create_merge_cols(
+                left_df,
+                right_df,
+                join_types[col_index],
+                left_col[col_index],
+                right_col[col_index],
+                accuracy[col_index],
+                absolute_accuracy[col_index],
+                datetime_tolerances[col_index],
+                col_index,
+            )
+
+        fuzzy_indices = [
+            col_index for col_index in range(len(left_col)) if not exact_joins[col_index]
+        ]
+        merge_cols = {}
+        if len(fuzzy_indices) > 0:
+            max_workers = max(1, min(len(fuzzy_indices), os.cpu_count() or 1))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                merge_cols = dict(zip(fuzzy_indices, executor.map(build, fuzzy_indices)))
+
         for col_index in range(len(left_col)):
-            # depending on the joining type, make a new dataframe that has columns we will want to merge on
             # keep track of which columns we will want to drop later on
-            if len(self._STRING_JOIN_TYPES.intersection(join_types[col_index])) > 0:
-                new_left_df = self._create_string_merge_cols(
-                    left_df,
-                    left_col[col_index],
-                    right_df,
-                    right_col[col_index],
-                    accuracy[col_index],
-                    col_index,
-                )
-                left_df[new_left_df.columns] = new_left_df
-                right_name = "righty_string" + str(col_index)
+            if exact_joins[col_index]:
+                # no fuzzy matching needed, so merge on the original left column
+                right_name = "righty_exact" + str(col_index)
                 right_df.rename(
                     columns={right_col[col_index]: right_name}, inplace=True
                 )
-                new_left_cols += list(new_left_df.columns)
+                new_left_cols.append(left_col[col_index])
                 new_right_cols.append(right_name)
-            elif len(self._NUMERIC_JOIN_TYPES.intersection(join_types[col_index])) > 0:
-                new_left_df = self._create_numeric_merge_cols(
-                    left_df,
-                    left_col[col_index],
-                    right_df,
-                    right_col[col_index],
-                    accuracy[col_index],
-                    col_index,
-                    absolute_accuracy[col_index],
-                )
-                left_df[new_left_df.columns] = new_left_df
-                right_name = "righty_numeric" + str(col_index)
-                right_df.rename(
-                    columns={right_col[col_index]: right_name}, inplace=True
-                )
-                new_left_cols += list(new_left_df.columns)
-                new_right_cols.append(right_name)
-            elif len(self._GEO_JOIN_TYPES.intersection(join_types[col_index])) > 0:
-                new_left_df, new_right_df = self._create_geo_vector_merging_cols(
-                    left_df,
-                    left_col[col_index],
-                    right_df,
-                    right_col[col_index],
-                    accuracy[col_index],
-                    col_index,
-                    absolute_accuracy[col_index],
-                )
-                left_df[new_left_df.columns] = new_left_df
-                right_df[new_right_df.columns] = new_right_df
-                new_left_cols += list(new_left_df.columns)
-                new_right_cols += list(new_right_df.columns)
-                right_cols_to_drop.append(right_col[col_index])
-            elif len(self._VECTOR_JOIN_TYPES.intersection(join_types[col_index])) > 0:
-                new_left_df, new_right_df = self._create_vector_merging_cols(
-                    left_df,
-                    left_col[col_index],
-                    right_df,
-                    right_col[col_index],
-                    accuracy[col_index],
-                    col_index,
-                    absolute_accuracy[col_index],
-                )
-                left_df[new_left_df.columns] = new_left_df
-                right_df[new_right_df.columns] = new_right_df
-                new_left_cols += list(new_left_df.columns)
-                new_right_cols += list(new_right_df.columns)
-                right_cols_to_drop.append(right_col[col_index])
-            elif len(self._DATETIME_JOIN_TYPES.intersection(join_types[col_index])) > 0:
-                tolerance = self._compute_datetime_tolerance(left_df_full, left_col[col_index], right_df, right_col[col_index], accuracy[col_index])
-                new_left_df, new_right_df = self._create_datetime_merge_cols(
-                    left_df,
-                    left_col[col_index],
-                    right_df,
-                    right_col[col_index],
-                    tolerance,
-                    col_index,
-                )
-                left_df[new_left_df.columns] = new_left_df
-                right_df[new_right_df.columns] = new_right_df
+                exact_left_cols.append(left_col[col_index])
+            else:
+                new_left_df, new_right_df = merge_cols[col_index]
+                left_pieces.append(new_left_df)
+                right_pieces.append(new_right_df)
                 new_left_cols += list(new_left_df.columns)
                 new_right_cols += list(new_right_df.columns)
                 right_cols_to_drop.append(right_col[col_index])
-            else:
-                raise exceptions.InvalidArgumentValueError(
-                    "join not surpported on type " + str(join_types[col_index])
-                )
+
+        # add all of the merge columns in one go - the new columns line up with the source rows
+        # by position
+        for piece in left_pieces:
+            piece.index = left_df.index
+        for piece in right_pieces:
+            piece.index = right_df.index
+        if len(left_pieces) > 0:
+            left_df = pd.concat([left_df] + left_pieces, axis=1, copy=False)
+        if len(right_pieces) > 0:
+            right_df = pd.concat([right_df] + right_pieces, axis=1, copy=False)
 
         if "d3mIndex" in right_df.columns:
             right_cols_to_drop.append("d3mIndex")
         right_df.drop(columns=right_cols_to_drop, inplace=True)
 
+        # left_df and right_df are local working copies at this point, so the merge can reuse
+        # their blocks rather than copying them again
         joined = pd.merge(
             left_df,
             right_df,
@@ -515,14 +540,85 @@ class FuzzyJoinPrimitive(
             left_on=new_left_cols,
             right_on=new_right_cols,
             suffixes=["_left", "_right"],
+            copy=False,
         )
 
         # don't want to keep columns that were created specifically for merging
         # also, inner merge keeps the right column we merge on, we want to remove it
-        joined.drop(columns=new_left_cols + new_right_cols, inplace=True)
+        joined.drop(
+            columns=[col for col in new_left_cols if col not in exact_left_cols]
+            + new_right_cols,
+            inplace=True,
+        )
 
         return joined
 
+    @classmethod
+    def _create_merge_cols(
+        cls,
+        left_df: container.DataFrame,
+        right_df: container.DataFrame,
+        join_type: typing.Set[str],
+        left_col: str,
+        right_col: str,
+        accuracy: float,
+        absolute_accuracy: bool,
+        datetime_tolerance: typing.Optional[np.timedelta64],
+        index: int,
+    ) -> typing.Tuple[pd.DataFrame, pd.DataFrame]:
+        # depending on the joining type, make new left and right dataframes that have the columns
+        # we will want to merge on
+        if len(cls._STRING_JOIN_TYPES.intersection(join_type)) > 0:
+            new_left_df = cls._create_string_merge_cols(
+                left_df, left_col, right_df, right_col, accuracy, index
+            )
+            # string and numeric matches merge against the right values as they are
+            new_right_df = container.DataFrame(
+                {"righty_string" + str(index): right_df[right_col]}
+            )
+        elif len(cls._NUMERIC_JOIN_TYPES.intersection(join_type)) > 0:
+            new_left_df = cls._create_numeric_merge_cols(
+                left_df,
+                left_col,
+                right_df,
+                right_col,
+                accuracy,
+                index,
+                absolute_accuracy,
+            )
+            new_right_df = container.DataFrame(
+                {"righty_numeric" + str(index): right_df[right_col]}
+            )
+        elif len(cls._GEO_JOIN_TYPES.intersection(join_type)) > 0:
+            new_left_df, new_right_df = cls._create_geo_vector_merging_cols(
+                left_df,
+                left_col,
+                right_df,
+                right_col,
+                accuracy,
+                index,
+                absolute_accuracy,
+            )
+        elif len(cls._VECTOR_JOIN_TYPES.intersection(join_type)) > 0:
+            new_left_df, new_right_df = cls._create_vector_merging_cols(
+                left_df,
+                left_col,
+                right_df,
+                right_col,
+                accuracy,
+                index,
+                absolute_accuracy,
+            )
+        elif len(cls._DATETIME_JOIN_TYPES.intersection(join_type)) > 0:
+            new_left_df, new_right_df = cls._create_datetime_merge_cols(
+                left_df, left_col, right_df, right_col, datetime_tolerance, index
+            )
+        else:
+            raise exceptions.InvalidArgumentValueError(
+                "join not surpported on type " + str(join_type)
+            )
+        return new_left_df, new_right_df
+
     def multi_produce(
         self,
         *,
@@ -563,13 +659,19 @@ class FuzzyJoinPrimitive(
         left: container.Dataset,
         left_resource_id: str,
         left_col: str,
+        left_indices: typing.Dict[str, int],
         right: container.Dataset,
         right_resource_id: str,
         right_col: str,
+        right_indices: typing.Dict[str, int],
     ) -> typing.Sequence[str]:
         # get semantic types for left and right cols
-        left_types = cls._get_column_semantic_type(left, left_resource_id, left_col)
-        right_types = cls._get_column_semantic_type(right, right_resource_id, right_col)
+        left_types = cls._get_column_semantic_type(
+            left, left_resource_id, left_col, left_indices
+        )
+        right_types = cls._get_column_semantic_type(
+            right, right_resource_id, right_col, right_indices
+        )
 
         # extract supported types
         supported_left_types = left_types.intersection(cls._SUPPORTED_TYPES)
@@ -594,9 +696,33 @@ class FuzzyJoinPrimitive(
         return join_types
 
     @classmethod
-    def _get_column_semantic_type(
-        cls, dataset: container.Dataset, resource_id: str, col_name: str
-    ) -> typing.Set[str]:
+    def _is_exact_join(
+        cls,
+        join_types: typing.Sequence[str],
+        left_values: pd.Series,
+        right_values: pd.Series,
+        accuracy: float,
+        is_absolute: bool,
+    ) -> bool:
+        # an accuracy of 1.0 (or an absolute tolerance of 0 for numbers) only accepts identical
+        # values, which a plain merge on the original columns already gives us.  numbers need to
+        # be stored as numbers on both sides since the fuzzy path parses them
+        if len(cls._STRING_JOIN_TYPES.intersection(join_types)) > 0:
+            return accuracy >= 1.0
+        if len(cls._NUMERIC_JOIN_TYPES.intersection(join_types)) > 0:
+            return (
+                (accuracy == 0.0 if is_absolute else accuracy >= 1.0)
+                and pd.api.types.is_numeric_dtype(left_values.dtype)
+                and pd.api.types.is_numeric_dtype(right_values.dtype)
+            )
+        return False
+
+    @classmethod
+    def _get_column_indices(
+        cls, dataset: container.Dataset, resource_id: str
+    ) -> typing.Dict[str, int]:
+        # map each column name to the first column index that has it
+        indices: typing.Dict[str, int] = {}
         for col_idx in range(
             dataset.metadata.query((resource_id, metadata_base.ALL_ELEMENTS))[
                 "dimension"
@@ -605,19 +731,71 @@ class FuzzyJoinPrimitive(
             col_metadata = dataset.metadata.query(
                 (resource_id, metadata_base.ALL_ELEMENTS, col_idx)
             )
-            if col_metadata.get("name", "") == col_name:
-                return set(col_metadata.get("semantic_types", ()))
-        return set()
+            indices.setdefault(col_metadata.get("name", ""), col_idx)
+        return indices
+
+    @classmethod
+    def _get_column_semantic_type(
+        cls,
+        dataset: container.Dataset,
+        resource_id: str,
+        col_name: str,
+        col_indices: typing.Dict[str, int],
+    ) -> typing.Set[str]:
+        col_idx = col_indices.get(col_name, None)
+        if col_idx is None:
+            return set()
+        col_metadata = dataset.metadata.query(
+            (resource_id, metadata_base.ALL_ELEMENTS, col_idx)
+        )
+        return set(col_metadata.get("semantic_types", ()))
 
     @classmethod
     def _string_fuzzy_match(
-        cls, match: typing.Any, choices: typing.Sequence[typing.Any], min_score: float
-    ) -> typing.Optional[str]:
-        choice, score, index = process.extractOne(match, choices)
-        val = None
-        if score >= min_score:
-            val = choice
-        return val
+        cls,
+        matches: typing.Sequence[typing.Any],
+        choices: typing.Sequence[typing.Any],
+        min_score: float,
+    ) -> np.ndarray:
+        # score every key against every choice in a single call and keep the best scoring choice
+        # for each key (first one on ties, same as extractOne) if it clears the minimum score
+        if len(choices) == 0:
+            return np.full(len(matches), None, dtype=object)
+
+        # normalise both sides once up front rather than inside the scorer - keys that normalise
+        # to the same string score identically, so only the distinct forms are scored and each
+        # normalised choice maps back to its first original
+        match_codes, match_keys = pd.factorize(
+            np.array([fuzz_utils.default_process(m) for m in matches], dtype=object)
+        )
+        choice_codes, choice_keys = pd.factorize(
+            np.array([fuzz_utils.default_process(c) for c in choices], dtype=object)
+        )
+        _, first_choices = np.unique(choice_codes, return_index=True)
+
+        best = np.empty(len(match_keys), dtype=np.intp)
+        best_scores = np.empty(len(match_keys), dtype=np.float64)
+        for start in range(0, len(match_keys), cls._MATCH_TILE_SIZE):
+            end = start + cls._MATCH_TILE_SIZE
+            scores = process.cdist(
+                match_keys[start:end],
+                choice_keys,
+                scorer=fuzz.WRatio,
+                processor=None,
+                score_cutoff=min_score,
+                dtype=np.float64,
+                workers=-1,
+            )
+            best[start:end] = scores.argmax(axis=1)
+            best_scores[start:end] = scores[
+                np.arange(scores.shape[0]), best[start:end]
+            ]
+        best_choices = np.where(
+            best_scores >= min_score,
+            np.asarray(choices, dtype=object)[first_choices[best]],
+            None,
+        )
+        return best_choices[match_codes]
 
     @classmethod
     def _create_string_merge_cols(
@@ -631,50 +809,101 @@ class FuzzyJoinPrimitive(
     ) -> pd.DataFrame:
 
         if accuracy < 1:
-            left_keys = left_df[left_col].unique()
-            right_keys = right_df[right_col].unique()
-            matches: typing.Dict[str, typing.Optional[str]] = {}
-            for left_key in left_keys:
-                matches[left_key] = cls._string_fuzzy_match(
-                    left_key, right_keys, accuracy * 100
+            left_values = left_df[left_col].to_numpy()
+            left_keys = pd.unique(left_values)
+            right_keys = pd.unique(right_df[right_col].to_numpy())
+            if left_keys.shape[0] < cls._UNIQUE_KEY_RATIO * left_values.shape[0]:
+                matches: typing.Dict[str, typing.Optional[str]] = dict(
+                    zip(
+                        left_keys,
+                        cls._string_fuzzy_match(left_keys, right_keys, accuracy * 100),
+                    )
+                )
+                # mapping through the dict itself is a vectorized lookup, unlike a per row lambda
+                new_left_df = container.DataFrame(
+                    {"lefty_string" + str(index): left_df[left_col].map(matches)}
+                )
+            else:
+                # mostly unique keys gain little from deduplicating first, so match the rows
+                # directly - missing matches are NaN, as they are when mapped through the dict
+                matched = cls._string_fuzzy_match(left_values, right_keys, accuracy * 100)
+                matched[pd.isnull(matched)] = np.nan
+                new_left_df = container.DataFrame(
+                    {"lefty_string" + str(index): matched}
                 )
-            new_left_df = container.DataFrame(
-                {
-                    "lefty_string"
-                    + str(index): left_df[left_col].map(lambda key: matches[key])
-                }
-            )
         else:
             new_left_df = container.DataFrame(
                 {"lefty_string" + str(index): left_df[left_col]}
             )
         return new_left_df
 
-    def _numeric_fuzzy_match(match, choices, accuracy, is_absolute):
-        # not sure if this is faster than applying a lambda against the sequence - probably is
-        min_distance = float("inf")
-        min_val = float("nan")
+    @classmethod
+    def _numeric_fuzzy_match(
+        cls,
+        matches: typing.Sequence[float],
+        choices: typing.Sequence[float],
+        accuracy: float,
+        is_absolute: bool,
+    ) -> np.ndarray:
+        # nearest choice for every match, or NaN if the nearest is outside the tolerance - the
+        # choices are sorted once so each match only has to look at the values on either side of
+        # its insertion point
+        matches = np.asarray(matches, dtype=np.float64)
+        choices = np.sort(np.asarray(choices, dtype=np.float64))
+        choices = choices[~np.isnan(choices)]
+        if choices.shape[0] == 0:
+            return np.full(matches.shape[0], np.nan)
+
+        n_choices = choices.shape[0]
+        upper_idx = np.clip(np.searchsorted(choices, matches), 1, max(n_choices - 1, 1))
+        lower = choices[upper_idx - 1]
+        upper = choices[np.minimum(upper_idx, n_choices - 1)]
+        nearest = np.where(matches - lower <= upper - matches, lower, upper)
+
         if is_absolute:
             tolerance = accuracy
         else:
-            inv_accuracy = 1.0 - accuracy
-            tolerance = float(match) * inv_accuracy
-        for i, num in enumerate(choices):
-            distance = abs(match - num)
-            if distance <= tolerance and distance <= min_distance:
-                min_val = num
-                min_distance = distance
-        return min_val
-
-    def _geo_fuzzy_match(match, choices, col, accuracy, is_absolute):
+            tolerance = np.abs(matches) * (1.0 - accuracy)
+        return np.where(np.abs(nearest - matches) <= tolerance, nearest, np.nan)
+
+    @classmethod
+    def _geo_fuzzy_match(
+        cls,
+        matches: np.ndarray,
+        choices: np.ndarray,
+        accuracy: float,
+        is_absolute: bool,
+    ) -> np.ndarray:
         # assume the accuracy is meters
         if not is_absolute:
             raise exceptions.InvalidArgumentTypeError(
                 "geo fuzzy match requires an absolute accuracy parameter that specifies the tolerance in meters"
             )
 
-        # keep the set of choices that falls within the acceptable distance
-        return choices[choices[col].map(lambda x: hs.haversine(match, x, Unit.METERS)) < accuracy]
+        # matches and choices are (polygons, points, 2) arrays.  a choice is a candidate for a
+        # match when each of its points is within the acceptable distance of the corresponding
+        # point of the match, and the first candidate is the match (-1 if there isn't one).
+        # distances are computed for a tile of matches against all choices at once.
+        # haversine_vector indexes its combined output by the second array first, so passing the
+        # choices first gives a (match, choice) matrix
+        first_match = np.full(matches.shape[0], -1, dtype=np.intp)
+        if choices.shape[0] == 0:
+            return first_match
+        n_points = min(matches.shape[1], choices.shape[1])
+        for start in range(0, matches.shape[0], cls._MATCH_TILE_SIZE):
+            match_tile = matches[start : start + cls._MATCH_TILE_SIZE]
+            candidates = np.ones((match_tile.shape[0], choices.shape[0]), dtype=bool)
+            for point in range(n_points):
+                candidates &= (
+                    haversine_vector(
+                        choices[:, point], match_tile[:, point], Unit.METERS, comb=True
+                    )
+                    < accuracy
+                )
+            first_match[start : start + cls._MATCH_TILE_SIZE] = np.where(
+                candidates.any(axis=1), candidates.argmax(axis=1), -1
+            )
+        return first_match
 
     @classmethod
     def _create_numeric_merge_cols(
@@ -691,10 +920,8 @@ class FuzzyJoinPrimitive(
         new_left_df = container.DataFrame(
             {
                 "lefty_numeric"
-                + str(index): pd.to_numeric(left_df[left_col]).map(
-                    lambda x: cls._numeric_fuzzy_match(
-                        x, choices, accuracy, is_absolute
-                    )
+                + str(index): cls._numeric_fuzzy_match(
+                    pd.to_numeric(left_df[left_col]), choices, accuracy, is_absolute
                 )
             }
         )
@@ -711,100 +938,41 @@ class FuzzyJoinPrimitive(
         index: int,
         is_absolute: bool,
     ) -> pd.DataFrame:
-        def fromstring(x: str) -> np.ndarray:
-            return np.fromstring(x, dtype=float, sep=",")
-        def topoints(x: np.ndarray) -> typing.Sequence[typing.Sequence[float]]:
-            # create a sequence of points by joining two successive values
-            it = iter(x)
-            return list(zip(it, it))
-
-        if type(left_df[left_col].iloc[0]) == str:
-            left_vector_length = np.fromstring(
-                left_df[left_col].iloc[0], dtype=float, sep=","
-            ).shape[0]
-            new_left_cols = [
-                "lefty_vector" + str(index) + "_" + str(i)
-                for i in range(int(left_vector_length/2))
-            ]
-            new_left_df = container.DataFrame(
-                left_df[left_col]
-                .apply(fromstring, convert_dtype=False)
-                .apply(topoints)
-                .values.tolist(),
-                columns=new_left_cols,
-            )
-        else:
-            left_vector_length = left_df[left_col].iloc[0].shape[0]
-            new_left_cols = [
-                "lefty_vector" + str(index) + "_" + str(i)
-                for i in range(int(left_vector_length/2))
-            ]
-            new_left_df = container.DataFrame(
-                left_df[left_col].apply(topoints).values.tolist(),
-                columns=new_left_cols,
-            )
-        if type(right_df[right_col].iloc[0]) == str:
-            right_vector_length = np.fromstring(
-                right_df[right_col].iloc[0], dtype=float, sep=","
-            ).shape[0]
-            new_right_cols = [
-                "righty_vector" + str(index) + "_" + str(i)
-                for i in range(int(right_vector_length/2))
-            ]
-            new_right_df = container.DataFrame(
-                right_df[right_col]
-                .apply(fromstring, convert_dtype=False)
-                .apply(topoints)
-                .values.tolist(),
-                columns=new_right_cols,
-            )
-        else:
-            right_vector_length = right_df[right_col].iloc[0].shape[0]
-            new_right_cols = [
-                "righty_vector" + str(index) + "_" + str(i)
-                for i in range(int(right_vector_length/2))
-            ]
-            new_right_df = container.DataFrame(
-                right_df[right_col].apply(topoints).values.tolist(),
-                columns=new_right_cols,
-            )
+        # lay the polygons out as (polygons, points, 2) arrays, dropping a trailing odd value
+        left_vectors = cls._to_vector_matrix(left_df[left_col])
+        right_vectors = cls._to_vector_matrix(right_df[right_col])
+        left_points = left_vectors[:, : left_vectors.shape[1] // 2 * 2].reshape(
+            left_vectors.shape[0], -1, 2
+        )
+        right_points = right_vectors[:, : right_vectors.shape[1] // 2 * 2].reshape(
+            right_vectors.shape[0], -1, 2
+        )
 
-        # get a unique name to hold the possible matches
-        base_name = 'righty_lefty'
-        unique_name = base_name
-        count = 1
-        while unique_name in new_left_df.columns:
-            unique_name = base_name + f'_{count}'
-            count = count + 1
-
-        # get an initial set of possible matches (should usually be a very small subset)
-        new_left_df[unique_name] = pd.Series([cls._geo_fuzzy_match(
-            p,
-            new_right_df,
-            new_right_cols[0],
-            accuracy,
-            is_absolute
-        ) for p in new_left_df[new_left_cols[0]]])
-
-        # process the remaining vector values to narrow down the set of matches
-        # this couldve all been done in a single loop but this keep it slightly cleaner
-        for i in range(1, len(new_left_cols)):
-            new_left_df[unique_name] = pd.Series([cls._geo_fuzzy_match(
-                p,
-                f,
-                new_right_cols[i],
-                accuracy,
-                is_absolute
-            ) for (p, f) in zip(new_left_df[new_left_cols[i]], new_left_df[unique_name])])
+        # find the first right polygon that is within the tolerance of each left polygon at all points
+        first_match = cls._geo_fuzzy_match(
+            left_points, right_points, accuracy, is_absolute
+        )
 
         # reduce the set of matches to either the first match or an empty set
         # NOTE: THIS IS NOT THE BEST WAY
         #   FOR JOINS, EITHER ALL MATCHES SHOULD BE KEPT OR ONLY THE CLOSEST MATCH SHOULD BE KEPT
         #   THE PREVIOUS IMPLEMENTATION WAS EVEN WORSE AS IT ONLY KEPT THE NEAREST MATCH AT ANY GIVEN POINT
         #   SO IF ONE POLYGON WAS NOT NEAREST AT EVERY POINT, THEN NO MATCH WAS MADE
-        tmp_df_left = pd.concat(new_left_df[unique_name].map(lambda x: x.head(1) if len(x) > 0 else pd.DataFrame([[None] * len(new_right_cols)], columns=new_right_cols)).tolist(), ignore_index=True)
-        new_left_df[new_left_cols] = tmp_df_left[new_right_cols]
-        new_left_df.drop(columns=[unique_name], inplace=True)
+        right_points = right_points.reshape(right_points.shape[0], -1)
+        matched = np.full((left_points.shape[0], right_points.shape[1]), np.nan)
+        has_match = first_match >= 0
+        matched[has_match] = right_points[first_match[has_match]]
+
+        # merge on the individual coordinates of the matched polygon
+        new_left_cols = [
+            "lefty_vector" + str(index) + "_" + str(i) for i in range(matched.shape[1])
+        ]
+        new_right_cols = [
+            "righty_vector" + str(index) + "_" + str(i)
+            for i in range(right_points.shape[1])
+        ]
+        new_left_df = container.DataFrame(matched, columns=new_left_cols)
+        new_right_df = container.DataFrame(right_points, columns=new_right_cols)
 
         return (new_left_df, new_right_df)
 
@@ -819,68 +987,93 @@ class FuzzyJoinPrimitive(
         index: int,
         is_absolute: bool,
     ) -> pd.DataFrame:
-        def fromstring(x: str) -> np.ndarray:
-            return np.fromstring(x, dtype=float, sep=",")
-
-        if type(left_df[left_col].iloc[0]) == str:
-            left_vector_length = np.fromstring(
-                left_df[left_col].iloc[0], dtype=float, sep=","
-            ).shape[0]
-            new_left_cols = [
-                "lefty_vector" + str(index) + "_" + str(i)
-                for i in range(left_vector_length)
-            ]
-            new_left_df = container.DataFrame(
-                left_df[left_col]
-                .apply(fromstring, convert_dtype=False)
-                .values.tolist(),
-                columns=new_left_cols,
-            )
-        else:
-            left_vector_length = left_df[left_col].iloc[0].shape[0]
-            new_left_cols = [
-                "lefty_vector" + str(index) + "_" + str(i)
-                for i in range(left_vector_length)
-            ]
-            new_left_df = container.DataFrame(
-                left_df[left_col].values.tolist(),
-                columns=new_left_cols,
+        left_vectors = cls._to_vector_matrix(left_df[left_col])
+        right_vectors = cls._to_vector_matrix(right_df[right_col])
+
+        new_left_cols = [
+            "lefty_vector" + str(index) + "_" + str(i)
+            for i in range(left_vectors.shape[1])
+        ]
+        new_right_cols = [
+            "righty_vector" + str(index) + "_" + str(i)
+            for i in range(right_vectors.shape[1])
+        ]
+        new_left_df = container.DataFrame(
+            cls._vector_fuzzy_match(left_vectors, right_vectors, accuracy, is_absolute),
+            columns=new_left_cols,
+        )
+        new_right_df = container.DataFrame(right_vectors, columns=new_right_cols)
+        return (new_left_df, new_right_df)
+
+    @classmethod
+    def _to_vector_matrix(cls, vectors: pd.Series) -> np.ndarray:
+        # parse a column of vectors into a single contiguous (rows, length) matrix - comma
+        # separated strings are joined and parsed in one call rather than one array per row
+        if vectors.shape[0] == 0:
+            return np.empty((0, 0))
+        if type(vectors.iloc[0]) == str:
+            # every row needs the same number of values, otherwise the joined values would shift
+            # into the neighbouring rows
+            lengths = vectors.str.count(",") + 1
+            lengths[vectors.str.strip() == ""] = 0
+            if (
+                lengths.isna().any()
+                or (lengths != lengths.iloc[0]).any()
+                or lengths.iloc[0] == 0
+            ):
+                raise exceptions.InvalidArgumentValueError(
+                    "vector column "
+                    + str(vectors.name)
+                    + " has missing or mismatched vector lengths"
+                )
+            return np.array(",".join(vectors).split(","), dtype=float).reshape(
+                vectors.shape[0], -1
             )
-        if type(right_df[right_col].iloc[0]) == str:
-            right_vector_length = np.fromstring(
-                right_df[right_col].iloc[0], dtype=float, sep=","
-            ).shape[0]
-            new_right_cols = [
-                "righty_vector" + str(index) + "_" + str(i)
-                for i in range(right_vector_length)
-            ]
-            new_right_df = container.DataFrame(
-                right_df[right_col]
-                .apply(fromstring, convert_dtype=False)
-                .values.tolist(),
-                columns=new_right_cols,
+        lengths = vectors.map(np.size)
+        if (lengths != lengths.iloc[0]).any():
+            raise exceptions.InvalidArgumentValueError(
+                "vector column " + str(vectors.name) + " has mismatched vector lengths"
             )
+        return np.stack(vectors.to_numpy()).astype(float, copy=False)
+
+    @classmethod
+    def _vector_fuzzy_match(
+        cls,
+        matches: np.ndarray,
+        choices: np.ndarray,
+        accuracy: float,
+        is_absolute: bool,
+    ) -> np.ndarray:
+        # nearest choice vector for every match vector, or NaN if there isn't one within the
+        # tolerance - the largest per dimension difference is used as the distance so that a
+        # match needs every dimension to be within the tolerance of the same choice
+        result = np.full(matches.shape, np.nan)
+        choices = choices[np.isfinite(choices).all(axis=1)]
+        valid = np.isfinite(matches).all(axis=1)
+        if choices.shape[0] == 0 or not valid.any():
+            return result
+
+        valid_matches = matches[valid]
+        if choices.shape[0] <= cls._SMALL_CHOICE_COUNT:
+            nearest_idx = np.empty(valid_matches.shape[0], dtype=np.intp)
+            for start in range(0, valid_matches.shape[0], cls._MATCH_TILE_SIZE):
+                end = start + cls._MATCH_TILE_SIZE
+                distances = np.abs(
+                    valid_matches[start:end, np.newaxis, :] - choices[np.newaxis, :, :]
+                ).max(axis=2)
+                nearest_idx[start:end] = distances.argmin(axis=1)
         else:
-            right_vector_length = right_df[right_col].iloc[0].shape[0]
-            new_right_cols = [
-                "righty_vector" + str(index) + "_" + str(i)
-                for i in range(right_vector_length)
-            ]
-            new_right_df = container.DataFrame(
-                right_df[right_col].values.tolist(),
-                columns=new_right_cols,
-            )
+            tree = spatial.cKDTree(choices)
+            _, nearest_idx = tree.query(valid_matches, p=np.inf)
+        nearest = choices[nearest_idx]
 
-        for i in range(len(new_left_cols)):
-            new_left_df[new_left_cols[i]] = new_left_df[new_left_cols[i]].map(
-                lambda x: cls._numeric_fuzzy_match(
-                    x,
-                    new_right_df[new_right_cols[i]],
-                    accuracy,
-                    is_absolute,
-                )
-            )
-        return (new_left_df, new_right_df)
+        if is_absolute:
+            tolerance = accuracy
+        else:
+            tolerance = np.abs(valid_matches) * (1.0 - accuracy)
+        within = (np.abs(nearest - valid_matches) <= tolerance).all(axis=1)
+        result[np.flatnonzero(valid)[within]] = nearest[within]
+        return result
 
     @classmethod
     def _create_datetime_merge_cols(
@@ -889,7 +1082,7 @@ class FuzzyJoinPrimitive(
         left_col: str,
         right_df: container.DataFrame,
         right_col: str,
-        tolerance: float,
+        tolerance: np.timedelta64,
         index: int,
     ) -> pd.DataFrame:
         # use d3mIndex from left col if present
@@ -897,65 +1090,76 @@ class FuzzyJoinPrimitive(
         # range
         left_name = "lefty_datetime" + str(index)
         right_name = "righty_datetime" + str(index)
-        new_right_df = container.DataFrame(
-            {
-                right_name: np.array(
-                    [np.datetime64(parser.parse(dt)) for dt in right_df[right_col]]
-                )
-            }
-        )
-        choices = np.unique(new_right_df[right_name])
-        left_keys = np.array(
-            [np.datetime64(parser.parse(dt)) for dt in left_df[left_col].values]
-        )
+        right_keys = cls._parse_datetimes(right_df[right_col])
+        new_right_df = container.DataFrame({right_name: right_keys})
+        left_keys = cls._parse_datetimes(left_df[left_col])
+
+        if tolerance <= np.timedelta64(0, "ns"):
+            # a zero tolerance only accepts identical dates, so a membership test is enough
+            matched = np.where(
+                np.isin(left_keys, right_keys), left_keys, np.datetime64("NaT")
+            )
+        else:
+            matched = cls._datetime_fuzzy_match(
+                left_keys, np.unique(right_keys), tolerance
+            )
+        new_left_df = container.DataFrame({left_name: matched})
+        return new_left_df, new_right_df
 
-        new_left_df = container.DataFrame(
-            {
-                left_name: np.array(
-                    [
-                        cls._datetime_fuzzy_match(dt, choices, tolerance)
-                        for dt in left_keys
-                    ]
-                )
-            }
+    @classmethod
+    def _parse_datetimes(cls, values: pd.Series) -> np.ndarray:
+        # bulk parse into naive UTC datetime64 values - the cache means repeated strings are only
+        # parsed once, and values that can't be parsed become NaT so they never match
+        parsed = pd.to_datetime(
+            values, cache=True, infer_datetime_format=True, utc=True, errors="coerce"
         )
-        return new_left_df, new_right_df
+        return pd.DatetimeIndex(parsed).tz_convert(None).to_numpy(dtype="datetime64[ns]")
 
     @classmethod
     def _datetime_fuzzy_match(
         cls,
-        match: np.datetime64,
-        choices: typing.Sequence[np.datetime64],
+        matches: np.ndarray,
+        choices: np.ndarray,
         tolerance: np.timedelta64,
-    ) -> typing.Optional[np.datetime64]:
-        min_distance = None
-        min_date = None
-        for i, date in enumerate(choices):
-            distance = abs(match - date)
-            if distance <= tolerance and (
-                min_distance is None or distance < min_distance
-            ):
-                min_distance = distance
-                min_date = date
-
+    ) -> np.ndarray:
         # default empty match to NaT to make it valid for datetime typing
-        if min_date is None:
-            min_date = pd.NaT
-        return min_date
+        result = np.full(matches.shape[0], np.datetime64("NaT"), dtype="datetime64[ns]")
+        choices = choices[~np.isnat(choices)]
+        if choices.shape[0] == 0:
+            return result
+
+        # search and compare the underlying nanosecond counts, which numpy handles faster than
+        # datetime64 values - NaT is just the smallest int64 there, so it's masked out explicitly
+        match_ns = matches.astype("datetime64[ns]", copy=False).view(np.int64)
+        choice_ns = choices.astype("datetime64[ns]", copy=False).view(np.int64)
+        tolerance_ns = np.timedelta64(tolerance, "ns").astype(np.int64)
+
+        # choices are sorted, so the nearest date is one of the two either side of the insertion
+        # point - ties go to the earlier date
+        upper_idx = np.minimum(np.searchsorted(choice_ns, match_ns), choice_ns.shape[0] - 1)
+        lower = choice_ns[np.maximum(upper_idx - 1, 0)]
+        upper = choice_ns[upper_idx]
+        lower_distance = np.abs(match_ns - lower)
+        upper_distance = np.abs(upper - match_ns)
+        use_lower = lower_distance <= upper_distance
+        nearest = np.where(use_lower, lower, upper)
+        distance = np.where(use_lower, lower_distance, upper_distance)
+
+        within = (distance <= tolerance_ns) & ~np.isnat(matches)
+        result.view(np.int64)[within] = nearest[within]
+        return result
 
     @classmethod
     def _compute_time_range(
-        cls, left: typing.Sequence[np.datetime64], right: typing.Sequence[np.datetime64]
-    ) -> float:
-        left_min = np.amin(left)
-        left_max = np.amax(left)
-        left_delta = left_max - left_min
-
-        right_min = np.amin(right)
-        right_max = np.amax(right)
-        right_delta = right_max - right_min
+        cls, left: np.ndarray, right: np.ndarray
+    ) -> np.timedelta64:
+        # unparseable values don't contribute to the range
+        left = left[~np.isnat(left)]
+        right = right[~np.isnat(right)]
+        if left.shape[0] == 0 or right.shape[0] == 0:
+            return np.timedelta64(0, "ns")
 
-        return min(left_delta, right_delta)
+        return min(np.ptp(left), np.ptp(right))
 
     @classmethod
     def _compute_datetime_tolerance(cls,
@@ -964,12 +1168,8 @@ class FuzzyJoinPrimitive(
         right_df: container.DataFrame,
         right_col: str,
         accuracy: float
-    ) -> typing.Dict[str, float]:
-        new_right_df = np.array(
-            [np.datetime64(parser.parse(dt)) for dt in right_df[right_col]]
-        )
-        choices = np.unique(new_right_df)
-        left_keys = np.array(
-            [np.datetime64(parser.parse(dt)) for dt in left_df[left_col].values]
-        )
-        return (1.0 - accuracy) * cls._compute_time_range(left_keys, choices)
+    ) -> np.timedelta64:
+        # only the range is needed here, so the right keys don't have to be sorted into unique values
+        right_keys = cls._parse_datetimes(right_df[right_col])
+        left_keys = cls._parse_datetimes(left_df[left_col])
+        return (1.0 - accuracy) * cls._compute_time_range(left_keys, right_keys)
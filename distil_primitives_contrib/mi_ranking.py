@@ -13,14 +13,15 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import collections
 import os
 import typing
 import logging
 from math import log
 from frozendict import FrozenOrderedDict
+from joblib import Parallel, delayed
 import numpy as np
 from scipy.sparse import issparse
-from scipy.special import digamma, gamma
 import pandas as pd  # type: ignore
 from d3m import container, utils as d3m_utils
 from d3m import exceptions
@@ -29,12 +30,10 @@ from d3m.primitive_interfaces import base, transformer
 from distil.utils import CYTHON_DEP
 from distil.primitives.enrich_dates import EnrichDatesPrimitive
 from sklearn.feature_selection import mutual_info_regression, mutual_info_classif
-from sklearn import metrics
 from sklearn import preprocessing
 from sklearn import utils as skl_utils
 from sklearn.neighbors import NearestNeighbors
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.utils import random
 import version
 
 __all__ = ("MIRankingPrimitive",)
@@ -43,6 +42,13 @@ logger = logging.getLogger(__name__)
 
 
 class Hyperparams(hyperparams.Hyperparams):
+    n_jobs = hyperparams.Hyperparameter[int](
+        default=-1,
+        semantic_types=[
+            "https://metadata.datadrivendiscovery.org/types/ControlParameter"
+        ],
+        description="The value of the n_jobs parameter for the joblib library",
+    )
     target_col_index = hyperparams.Hyperparameter[typing.Optional[int]](
         default=None,
         semantic_types=[
@@ -78,6 +84,35 @@ class Hyperparams(hyperparams.Hyperparams):
         ],
         description="If sub-sampling, the size of the subsample",
     )
+    top_k = hyperparams.Union[typing.Union[int, None]](
+        configuration=collections.OrderedDict(
+            limit=hyperparams.Bounded[int](lower=1, upper=None, default=1),
+            unlimited=hyperparams.Constant(None),
+        ),
+        default="unlimited",
+        semantic_types=[
+            "https://metadata.datadrivendiscovery.org/types/ControlParameter"
+        ],
+        description="If set, only the top k ranked features are returned",
+    )
+    estimator = hyperparams.Enumeration[str](
+        default="ksg",
+        values=("ksg", "histogram"),
+        semantic_types=[
+            "https://metadata.datadrivendiscovery.org/types/ControlParameter"
+        ],
+        description="How numeric features are scored - 'ksg' uses nearest neighbour MI estimates, while 'histogram' bins continuous values and scores every numeric feature as discrete, which is much faster on large inputs at some cost in accuracy",
+    )
+    n_bins = hyperparams.UniformInt(
+        lower=2,
+        upper=256,
+        default=32,
+        upper_inclusive=True,
+        semantic_types=[
+            "https://metadata.datadrivendiscovery.org/types/ControlParameter"
+        ],
+        description="Number of uniform bins continuous values are split into by the histogram estimator",
+    )
 
 
 class MIRankingPrimitive(
@@ -179,17 +214,18 @@ class MIRankingPrimitive(
         return valid_struct_type and valid_semantic_type
 
     @classmethod
-    def _append_rank_info(
+    def _columns_with_semantic_types(
         cls,
-        inputs: container.DataFrame,
-        result: typing.List[typing.Tuple[int, str, float]],
-        rank_np: np.array,
-        rank_df: pd.DataFrame,
-    ) -> typing.List[typing.Tuple[int, str, float]]:
-        for i, rank in enumerate(rank_np):
-            col_name = rank_df.columns.values[i]
-            result.append((inputs.columns.get_loc(col_name), col_name, rank))
-        return result
+        columns_metadata: typing.Sequence[typing.Mapping[str, typing.Any]],
+        semantic_types: typing.Sequence[str],
+    ) -> typing.List[int]:
+        # indices of the columns that have at least one of the semantic types
+        semantic_types = set(semantic_types)
+        return [
+            i
+            for i, column_metadata in enumerate(columns_metadata)
+            if not semantic_types.isdisjoint(column_metadata.get("semantic_types", ()))
+        ]
 
     def produce(
         self,
@@ -218,7 +254,12 @@ class MIRankingPrimitive(
                 if self.hyperparams["sub_sample_size"] < inputs.shape[0]
                 else inputs.shape[0]
             )
-            rows = random.sample_without_replacement(inputs.shape[0], sub_sample_size)
+            # seed the sample so repeated runs rank the same rows, and keep the rows in their
+            # original order so the slice reads through the frame sequentially
+            rng = np.random.default_rng(self._random_seed)
+            rows = np.sort(
+                rng.choice(inputs.shape[0], size=sub_sample_size, replace=False)
+            )
             feature_df = feature_df.iloc[rows, :]
         # makes sure that if an entire column is NA, we remove that column, so as to not remove ALL rows
         cols_to_drop = feature_df.columns[
@@ -232,46 +273,46 @@ class MIRankingPrimitive(
             :, feature_df.columns.get_loc(inputs.columns[target_idx])
         ]
 
+        # read each column's metadata once and work out the column groups from that, rather than
+        # scanning the metadata again for every group
+        columns_metadata = [
+            inputs.metadata.query_column(i) for i in range(inputs.shape[1])
+        ]
+
         # drop features that are not compatible with ranking
         feature_indices = set(
-            inputs.metadata.list_columns_with_semantic_types(self._semantic_types)
+            self._columns_with_semantic_types(columns_metadata, self._semantic_types)
         )
+        # the target is never ranked against itself, so take it out of the candidates up front -
+        # this also covers targets that don't carry a role type
         role_indices = set(
-            inputs.metadata.list_columns_with_semantic_types(self._roles)
+            self._columns_with_semantic_types(columns_metadata, self._roles)
         )
+        role_indices.discard(target_idx)
         feature_indices = feature_indices.intersection(role_indices)
-        feature_indices.remove(target_idx)
-        for categ_ind in inputs.metadata.list_columns_with_semantic_types(
-            ("https://metadata.datadrivendiscovery.org/types/CategoricalData",)
+        for categ_ind in self._columns_with_semantic_types(
+            columns_metadata,
+            ("https://metadata.datadrivendiscovery.org/types/CategoricalData",),
         ):
             if categ_ind in feature_indices:
                 if (
-                    np.unique(inputs[inputs.columns[categ_ind]]).shape[0]
+                    inputs[inputs.columns[categ_ind]].nunique(dropna=False)
                     == inputs.shape[0]
                 ):
                     feature_indices.remove(categ_ind)
-                elif (
-                    inputs.metadata.query((metadata_base.ALL_ELEMENTS, categ_ind))[
-                        "structural_type"
-                    ]
-                    == str
-                ):
+                elif columns_metadata[categ_ind]["structural_type"] == str:
                     feature_df[inputs.columns[categ_ind]] = pd.to_numeric(
                         feature_df[inputs.columns[categ_ind]]
                     )
-        text_indices = inputs.metadata.list_columns_with_semantic_types(
-            self._text_semantic
+        text_indices = self._columns_with_semantic_types(
+            columns_metadata, self._text_semantic
         )
 
         tfv = TfidfVectorizer(max_features=20)
         column_to_text_features = {}
         text_feature_indices = []
         for text_index in text_indices:
-            if (
-                text_index not in feature_indices
-                and text_index in role_indices
-                and text_index != target_idx
-            ):
+            if text_index not in feature_indices and text_index in role_indices:
                 word_features = tfv.fit_transform(
                     feature_df[inputs.columns[text_index]]
                 )
@@ -300,12 +341,21 @@ class MIRankingPrimitive(
         for i, v in enumerate(skipped_indices):
             feature_df.drop(inputs.columns[v], axis=1, inplace=True)
 
+        # a constant feature carries no information about the target, so rank it 0 directly
+        # rather than running it through the estimators, where its zero entropy would break
+        # the normalization
+        constant_indices = sorted(
+            i for i in feature_indices if feature_df[inputs.columns[i]].nunique() <= 1
+        )
+        feature_indices = feature_indices - set(constant_indices)
+        numeric_features = len(feature_indices) > 0
+
         # figure out the discrete and continuous feature indices and create an array
         # that flags them
         feature_columns = inputs.columns[list(feature_indices)]
         numeric_data = feature_df[feature_columns]
-        discrete_indices = inputs.metadata.list_columns_with_semantic_types(
-            self._discrete_types
+        discrete_indices = self._columns_with_semantic_types(
+            columns_metadata, self._discrete_types
         )
         discrete_flags = [False] * numeric_data.shape[1]
         for v in discrete_indices:
@@ -321,56 +371,59 @@ class MIRankingPrimitive(
         target_np = target_df.values
 
         # compute mutual information for discrete or continuous target
+        histogram = self.hyperparams["estimator"] == "histogram"
+        mutual_info = mutual_info_classif if discrete else mutual_info_regression
         ranked_features_np = np.empty([0])
-        text_ranked_features_np = np.empty((len(column_to_text_features),))
-        if discrete:
-            if numeric_features:
-                ranked_features_np = mutual_info_classif(
-                    numeric_data.values,
-                    target_np,
-                    discrete_features=discrete_flags,
-                    n_neighbors=self.hyperparams["k"],
-                    random_state=self._random_seed,
-                )
-            for i, column in enumerate(column_to_text_features):
-                text_rankings = mutual_info_classif(
-                    column_to_text_features[column],
-                    target_np,
-                    discrete_features=[False]
-                    * column_to_text_features[column].shape[1],
-                    n_neighbors=self.hyperparams["k"],
-                    random_state=self._random_seed,
+        if numeric_features and not histogram:
+            ranked_features_np = mutual_info(
+                numeric_data.values,
+                target_np,
+                discrete_features=discrete_flags,
+                n_neighbors=self.hyperparams["k"],
+                random_state=self._random_seed,
+            )
+
+        # each text column is scored with its own MI call, so those can run in parallel - the
+        # numeric features stay in a single call since splitting them up would change the noise
+        # sklearn adds to continuous features, and with it the ranks
+        text_rankings = Parallel(n_jobs=self.hyperparams["n_jobs"], prefer="threads")(
+            delayed(mutual_info)(
+                column_to_text_features[column],
+                target_np,
+                discrete_features=[False] * column_to_text_features[column].shape[1],
+                n_neighbors=self.hyperparams["k"],
+                random_state=self._random_seed,
+            )
+            for column in column_to_text_features
+        )
+        text_ranked_features_np = np.array(
+            [np.sum(rankings) for rankings in text_rankings], dtype=np.float64
+        )
+
+        if histogram:
+            ranked_features_np = self._histogram_ranks(
+                numeric_data,
+                target_np,
+                discrete,
+                set(inputs.columns[discrete_indices]),
+            )
+            # text features are still scored with nearest neighbour estimates, so they still
+            # need the target's entropy to normalize against
+            target_entropy = None
+            if len(column_to_text_features) > 0:
+                target_entropy = (
+                    self._discrete_entropy(target_np)
+                    if discrete
+                    else self._continuous_entropy(target_np)
                 )
-                sum_text_rank = np.sum(text_rankings)
-                text_ranked_features_np[i] = sum_text_rank
         else:
-            if numeric_features:
-                ranked_features_np = mutual_info_regression(
-                    numeric_data.values,
-                    target_np,
-                    discrete_features=discrete_flags,
-                    n_neighbors=self.hyperparams["k"],
-                    random_state=self._random_seed,
-                )
-            for i, column in enumerate(column_to_text_features):
-                text_rankings = mutual_info_regression(
-                    column_to_text_features[column],
-                    target_np,
-                    discrete_features=[False]
-                    * column_to_text_features[column].shape[1],
-                    n_neighbors=self.hyperparams["k"],
-                    random_state=self._random_seed,
-                )
-                sum_text_rank = np.sum(text_rankings)
-                text_ranked_features_np[i] = sum_text_rank
-
-        ranked_features_np, target_entropy = self._normalize(
-            ranked_features_np,
-            feature_df[feature_columns],
-            target_np,
-            discrete,
-            discrete_flags,
-        )
+            ranked_features_np, target_entropy = self._normalize(
+                ranked_features_np,
+                feature_df[feature_columns],
+                target_np,
+                discrete,
+                discrete_flags,
+            )
         text_ranked_features_np = self._normalize_text(
             text_ranked_features_np, column_to_text_features, target_entropy
         )
@@ -385,20 +438,40 @@ class MIRankingPrimitive(
                     (metadata_base.ALL_ELEMENTS, f),
                     FrozenOrderedDict(rank_dict.items()),
                 )
+            for f in constant_indices:
+                column_metadata = inputs.metadata.query((metadata_base.ALL_ELEMENTS, f))
+                rank_dict = dict(column_metadata)
+                rank_dict["rank"] = 0.0
+                inputs.metadata = inputs.metadata.update(
+                    (metadata_base.ALL_ELEMENTS, f),
+                    FrozenOrderedDict(rank_dict.items()),
+                )
             return base.CallResult(inputs)
 
-        # merge back into a single list of col idx / rank value tuples
-        data: typing.List[typing.Tuple[int, str, float]] = []
-        data = self._append_rank_info(
-            inputs, data, ranked_features_np, feature_df[feature_columns]
+        # merge back into flat name / rank arrays, and look up all the column indices at once
+        names = np.array(
+            list(feature_columns)
+            + list(inputs.columns[list(text_feature_indices)])
+            + list(inputs.columns[constant_indices]),
+            dtype=object,
         )
-        data = self._append_rank_info(
-            inputs,
-            data,
-            text_ranked_features_np,
-            feature_df[inputs.columns[list(text_feature_indices)]],
+        ranks = np.concatenate(
+            [
+                ranked_features_np,
+                text_ranked_features_np,
+                np.zeros(len(constant_indices)),
+            ]
         )
 
+        # when only the best features are wanted, partition them out so that just those get sorted
+        top_k = self.hyperparams["top_k"]
+        if top_k is not None and top_k < ranks.shape[0]:
+            top = np.argpartition(-ranks, top_k)[:top_k]
+            names = names[top]
+            ranks = ranks[top]
+
+        data = {"idx": inputs.columns.get_indexer(names), "name": names, "rank": ranks}
+
         # wrap as a D3M container - metadata should be auto generated
         results = container.DataFrame(data=data, columns=cols, generate_metadata=True)
         results = results.sort_values(by=["rank"], ascending=False).reset_index(
@@ -410,22 +483,27 @@ class MIRankingPrimitive(
         self, ranked_features, feature_df, target_np, discrete, discrete_flags
     ):
         normalized_ranked_features = np.empty(ranked_features.shape[0])
+
+        # the continuous feature entropies are independent nearest neighbour estimates, so work
+        # them all out up front in parallel - a continuous target's entropy goes in the same batch
+        continuous_indices = [
+            i for i in range(ranked_features.shape[0]) if not discrete_flags[i]
+        ]
+        continuous_columns = [feature_df.iloc[:, i].values for i in continuous_indices]
+        if not discrete:
+            continuous_columns.append(target_np)
+        entropies = self._continuous_entropies(continuous_columns)
+        continuous_entropies = dict(zip(continuous_indices, entropies))
+
         if discrete:
             target_entropy = self._discrete_entropy(target_np)
+            # features are never flagged discrete against a discrete target (see produce), so
+            # they are all normalized by their continuous entropy here
             for i in range(ranked_features.shape[0]):
-                if discrete_flags[i]:
-                    normalized_ranked_features[
-                        i
-                    ] = metrics.normalized_mutual_info_score(
-                        target_np, feature_df.iloc[:, i], average_method="geometric"
-                    )
-                else:
-                    feature_entropy = self._continuous_entropy(
-                        feature_df.iloc[:, i].values
-                    )
-                    normalized_ranked_features[i] = ranked_features[i] / np.sqrt(
-                        feature_entropy * target_entropy
-                    )
+                feature_entropy = continuous_entropies[i]
+                normalized_ranked_features[i] = ranked_features[i] / np.sqrt(
+                    feature_entropy * target_entropy
+                )
                 if normalized_ranked_features[i] > 1.0:
                     normalized_ranked_features[i] = 1.0
             # target_entropy = self._discrete_entropy(target_np)
@@ -449,7 +527,7 @@ class MIRankingPrimitive(
             #             else:
             #                 normalized_ranked_features[i] = naive_mi
         else:
-            target_entropy = self._continuous_entropy(target_np)
+            target_entropy = entropies[-1]
             for i in range(ranked_features.shape[0]):
                 if discrete_flags[i]:
                     feature_entropy = self._discrete_entropy(feature_df.iloc[:, i])
@@ -457,9 +535,7 @@ class MIRankingPrimitive(
                         feature_entropy * target_entropy
                     )
                 else:
-                    feature_entropy = self._continuous_entropy(
-                        feature_df.iloc[:, i].values
-                    )
+                    feature_entropy = continuous_entropies[i]
                     normalized_ranked_features[i] = ranked_features[i] / np.sqrt(
                         feature_entropy * target_entropy
                     )
@@ -491,15 +567,100 @@ class MIRankingPrimitive(
         self, text_ranked_features_np, column_to_text_features, target_entropy
     ):
         for i, column in enumerate(column_to_text_features):
+            text_entropies = self._continuous_entropies(
+                list(column_to_text_features[column].values.T)
+            )
             text_ranked_features_np[i] = text_ranked_features_np[i] / np.sqrt(
-                np.apply_along_axis(
-                    self._continuous_entropy, 0, column_to_text_features[column].values
-                ).sum()
-                * target_entropy
+                np.array(text_entropies).sum() * target_entropy
             )
         text_ranked_features_np[text_ranked_features_np > 1] = 1.0
         return text_ranked_features_np
 
+    def _histogram_ranks(
+        self,
+        numeric_data: pd.DataFrame,
+        target_np: np.ndarray,
+        discrete: bool,
+        discrete_columns: typing.Set[str],
+    ) -> np.ndarray:
+        # bin the continuous columns and the target so that every feature can be scored with the
+        # discrete kernel, skipping the nearest neighbour estimates entirely
+        target_values = target_np if discrete else self._histogram_bins(target_np)
+        target_codes = np.unique(target_values, return_inverse=True)[1]
+        ranks = np.array(
+            [
+                self._normalized_discrete_mi(
+                    target_codes,
+                    values.values
+                    if column in discrete_columns
+                    else self._histogram_bins(values.values),
+                )
+                for column, values in numeric_data.items()
+            ],
+            dtype=np.float64,
+        )
+        # cap rounding overshoot the same way _normalize does
+        ranks[ranks > 1.0] = 1.0
+        return ranks
+
+    def _histogram_bins(self, values: np.ndarray) -> np.ndarray:
+        # uniform bins over the value range, left closed like np.histogram with the maximum
+        # falling into the last bin
+        values = values.astype(np.float64)
+        n_bins = self.hyperparams["n_bins"]
+        edges = np.linspace(values.min(), values.max(), n_bins + 1)
+        return np.clip(np.digitize(values, edges) - 1, 0, n_bins - 1)
+
+    @classmethod
+    def _normalized_discrete_mi(
+        cls, target_codes: np.ndarray, feature: np.ndarray
+    ) -> float:
+        # geometric normalized mutual information, computed the same way as sklearn's
+        # normalized_mutual_info_score, but from a joint histogram built with a single bincount
+        # over the already encoded target
+        feature_codes = np.unique(feature, return_inverse=True)[1]
+        n_target = target_codes.max() + 1 if target_codes.shape[0] > 0 else 0
+        n_feature = feature_codes.max() + 1 if feature_codes.shape[0] > 0 else 0
+
+        # no split on either side is a perfect match
+        if n_target == n_feature and n_target <= 1:
+            return 1.0
+        # a single label on just one side carries no information - the sum below would only be
+        # rounding residue, which the eps floor on the normalizer would blow up
+        if n_target == 1 or n_feature == 1:
+            return 0.0
+
+        joint = np.bincount(
+            target_codes * n_feature + feature_codes, minlength=n_target * n_feature
+        ).reshape(n_target, n_feature)
+        n = float(target_codes.shape[0])
+        target_counts = joint.sum(axis=1)
+        feature_counts = joint.sum(axis=0)
+
+        # log(a / b) is calculated as log(a) - log(b) for possible loss of precision
+        nz_target, nz_feature = np.nonzero(joint)
+        nz_joint = joint[nz_target, nz_feature].astype(np.float64)
+        joint_p = nz_joint / n
+        outer = target_counts[nz_target] * feature_counts[nz_feature]
+        log_outer = -np.log(outer) + log(n) + log(n)
+        mi = max((joint_p * (np.log(nz_joint) - log(n)) + joint_p * log_outer).sum(), 0.0)
+        if mi == 0.0:
+            return 0.0
+
+        target_entropy, feature_entropy = [
+            -np.sum((p / n) * (np.log(p) - log(n)))
+            for p in (
+                target_counts[target_counts > 0].astype(np.float64),
+                feature_counts[feature_counts > 0].astype(np.float64),
+            )
+        ]
+
+        # avoid 0 / 0 when either entropy is zero
+        normalizer = max(
+            np.sqrt(target_entropy * feature_entropy), np.finfo("float64").eps
+        )
+        return mi / normalizer
+
     def _discrete_entropy(self, labels):
         """Calculates the entropy for a labeling.
         Parameters
@@ -525,6 +686,13 @@ class MIRankingPrimitive(
             )
         return entropy
 
+    def _continuous_entropies(
+        self, columns: typing.Sequence[np.ndarray]
+    ) -> typing.List[float]:
+        return Parallel(n_jobs=self.hyperparams["n_jobs"], prefer="threads")(
+            delayed(self._continuous_entropy)(column) for column in columns
+        )
+
     def _continuous_entropy(self, x):
         k = self.hyperparams["k"]
         result = mutual_info_regression(
@@ -534,67 +702,4 @@ class MIRankingPrimitive(
             n_neighbors=k,
             random_state=self._random_seed,
         )[0]
-        # sorted_x = np.sort(x)
-
-        # eps_distances = np.empty(x.shape[0])
-        # k_all = np.full(x.shape, k - 1)
-        # for i in range(x.shape[0]):
-        #     eps = 0
-        #     # need to prevent having an epsilon value of 0
-        #     # as a fall back, increase k to find farther neighbours
-        #     while eps == 0 and k_all[i] < x.shape[0]:
-        #         k_all[i] += 1
-        #         eps = self._eps(sorted_x, i, k_all[i])
-        #     if eps == 0 and k_all[i] == x.shape[0]:
-        #         raise exceptions.InvalidArgumentValueError('inputs has too many non-unique values or not enough values possibly')
-        #     eps_distances[i] = eps
-
-        # log_mean = np.mean(np.log(eps_distances))
-        # if log_mean == float('-inf'):
-        #     raise exceptions.InvalidArgumentValueError('inputs has too many non-unique values or not enough values possibly')
-
-        # # this estimation is https://arxiv.org/pdf/cond-mat/0305641.pdf
-        # # the KSG estimator
-        # ksg_entropy = - np.mean(digamma(k_all)) + digamma(x.shape[0]) + log_mean
-        # # a more naive estimator
-        # # this estimation is from http://papers.neurips.cc/paper/3417-estimation-of-information-theoretic-measures-for-continuous-random-variables.pdf
-        # naive_entropy = - np.mean(np.log(k_all/(x.shape[0] - 1) * gamma(1.5) / pow(3.14159, 0.5) * 1 / eps_distances)) - np.mean(digamma(k_all))
         return result
-
-    def _eps(self, x, i, k):
-        return 2 * abs(x[self._k_closest_neighbour(x, i, k)] - x[i])
-
-    # assumes a is sorted
-    def _k_closest_neighbour(self, a, i, k):
-        length = len(a)
-        j = 0
-        if i == 0:
-            l = -1
-            r = i + 1
-        elif i == length - 1:
-            r = length
-            l = i - 1
-        else:
-            r = i + 1
-            l = i - 1
-        kth_closest = i
-        while j < k:
-            if r == length:
-                if l == -1:
-                    if abs(a[0] - a[i]) > abs(a[length - 1] - a[i]):
-                        return 0
-                    return length - 1
-                elif abs(a[r - 1] - a[i]) <= abs(a[l] - a[i]):
-                    kth_closest = l
-                    l -= 1
-            elif l == -1 and abs(a[r] - a[i]) >= abs(a[0] - a[i]):
-                kth_closest = r
-                r += 1
-            elif r < length and abs(a[r] - a[i]) <= abs(a[l] - a[i]):
-                kth_closest = r
-                r += 1
-            elif l > -1 and abs(a[r] - a[i]) >= abs(a[l] - a[i]):
-                kth_closest = l
-                l -= 1
-            j += 1
-        return kth_closest
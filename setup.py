@@ -30,14 +30,15 @@ setup(
     license="Apache-2.0",
     install_requires=[
         "d3m",  # d3m best-practice moving forward is to remove the version (simplifies updates)
-        # shared d3m versions - need to be aligned with core package
-        "scikit-learn==0.22.2.post1",
-        "numpy==1.18.2",
+        # shared d3m versions - need to be aligned with core package, so only set a floor and let
+        # the core package's pins decide the exact version
+        "scikit-learn>=0.22.2.post1",
+        "numpy>=1.18.2",
         "pandas>=1.1.3",
         # additional dependencies
         "joblib>=0.13.2",
         "haversine==2.3.1",
-        "rapidfuzz==1.5.1"
+        "rapidfuzz==1.7.0"
     ],
     entry_points={
         "d3m.primitives": [
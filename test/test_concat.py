@@ -13,11 +13,17 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import gc
+import typing
 import unittest
 from os import path
 
+import numpy as np
+import pandas as pd
+
 from d3m import container, exceptions
 from distil.primitives.column_parser import ColumnParserPrimitive
+from distil_primitives_contrib import concat
 from distil_primitives_contrib.concat import VerticalConcatenationPrimitive as VCPrimitive
 from d3m.metadata import base as metadata_base
 
@@ -254,6 +260,261 @@ class VerticalConcatenationPrimitiveTestCase(unittest.TestCase):
         self.assertEqual(result_dataframe["alpha"].isnull().sum(), 0)
         self.assertEqual(result_dataframe["gamma"].isnull().sum(), 0)
 
+    def test_single_input(self) -> None:
+        dataframe_1 = self._load_data(self._dataset_path_1)
+
+        hyperparams_class = VCPrimitive.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        hyperparams = hyperparams_class.defaults().replace(
+            {"remove_duplicate_rows": False, "column_overlap": "exact"}
+        )
+        concat_prim = VCPrimitive(hyperparams=hyperparams)
+        result_dataframe = concat_prim.produce(
+            inputs=container.List([dataframe_1])
+        ).value["learningData"]
+
+        self.assertListEqual(list(result_dataframe.shape), list(dataframe_1.shape))
+        self.assertListEqual(list(result_dataframe.columns), list(dataframe_1.columns))
+
+        # the output is a copy, so changing it leaves the input alone
+        self.assertIsNot(result_dataframe, dataframe_1)
+        result_dataframe.iloc[0, 1] = "changed"
+        self.assertEqual(dataframe_1.iloc[0, 1], "yankee")
+
+    def test_remove_duplicate_rows_int_keys(self) -> None:
+        dataframe_1 = container.DataFrame(
+            {"d3mIndex": [1, 2, 3], "alpha": ["a", "b", "c"]}, generate_metadata=True
+        )
+        dataframe_2 = container.DataFrame(
+            {"d3mIndex": [3, 4, 1], "alpha": ["x", "d", "y"]}, generate_metadata=True
+        )
+        result_dataframe = self._produce([dataframe_1, dataframe_2])
+
+        # the first occurrence of each index is kept
+        self.assertListEqual(list(result_dataframe["d3mIndex"]), [1, 2, 3, 4])
+        self.assertListEqual(list(result_dataframe["alpha"]), ["a", "b", "c", "d"])
+        self.assertEqual(result_dataframe["d3mIndex"].dtype, np.int64)
+
+    def test_remove_duplicate_rows_object_keys(self) -> None:
+        dataframe_1 = container.DataFrame(
+            {"d3mIndex": ["a", "b", "c"], "bravo": [1.0, 2.0, 3.0]},
+            generate_metadata=True,
+        )
+        dataframe_2 = container.DataFrame(
+            {"d3mIndex": ["c", "d", "a", "d"], "bravo": [4.0, 5.0, 6.0, 7.0]},
+            generate_metadata=True,
+        )
+        result_dataframe = self._produce([dataframe_1, dataframe_2])
+
+        self.assertListEqual(list(result_dataframe["d3mIndex"]), ["a", "b", "c", "d"])
+        self.assertListEqual(list(result_dataframe["bravo"]), [1.0, 2.0, 3.0, 5.0])
+
+    def test_disjoint_keys(self) -> None:
+        # increasing, non-overlapping index ranges can't hold duplicates
+        self.assertTrue(
+            VCPrimitive._keys_disjoint([pd.Series([4, 5, 6]), pd.Series([1, 2, 3])])
+        )
+        self.assertFalse(
+            VCPrimitive._keys_disjoint([pd.Series([1, 2, 3]), pd.Series([3, 4])])
+        )
+        self.assertFalse(
+            VCPrimitive._keys_disjoint([pd.Series([1, 3, 2]), pd.Series([4, 5])])
+        )
+        self.assertFalse(
+            VCPrimitive._keys_disjoint([pd.Series(["a"]), pd.Series(["b"])])
+        )
+
+        dataframe_1 = container.DataFrame(
+            {"d3mIndex": [1, 2, 3], "alpha": ["a", "b", "c"]}, generate_metadata=True
+        )
+        dataframe_2 = container.DataFrame(
+            {"d3mIndex": [4, 5], "alpha": ["d", "e"]}, generate_metadata=True
+        )
+        result_dataframe = self._produce([dataframe_1, dataframe_2])
+        self.assertListEqual(list(result_dataframe["d3mIndex"]), [1, 2, 3, 4, 5])
+
+    def test_union_missing_columns(self) -> None:
+        dataframe_1 = container.DataFrame(
+            {
+                "d3mIndex": [1, 2],
+                "alpha": ["a", "b"],
+                "bravo": [1.5, 2.5],
+                "charlie": [10, 20],
+            },
+            generate_metadata=True,
+        )
+        dataframe_2 = container.DataFrame(
+            {"d3mIndex": [3, 4], "charlie": [30, 40], "delta": ["c", "d"]},
+            generate_metadata=True,
+        )
+        result_dataframe = self._produce([dataframe_1, dataframe_2])
+
+        self.assertListEqual(
+            list(result_dataframe.columns),
+            ["d3mIndex", "alpha", "bravo", "charlie", "delta"],
+        )
+        self.assertListEqual(list(result_dataframe["d3mIndex"]), [1, 2, 3, 4])
+        self.assertListEqual(list(result_dataframe["charlie"]), [10, 20, 30, 40])
+        self.assertEqual(result_dataframe["d3mIndex"].dtype, np.int64)
+        self.assertEqual(result_dataframe["charlie"].dtype, np.int64)
+
+        # missing values are filled with NaN, and float and object columns keep their dtype
+        self.assertListEqual(list(result_dataframe["alpha"][:2]), ["a", "b"])
+        self.assertTrue(result_dataframe["alpha"][2:].isnull().all())
+        self.assertTrue(pd.api.types.is_string_dtype(result_dataframe["alpha"].dtype))
+        np.testing.assert_array_equal(
+            result_dataframe["bravo"].to_numpy(), [1.5, 2.5, np.nan, np.nan]
+        )
+        self.assertEqual(result_dataframe["bravo"].dtype, np.float64)
+        self.assertTrue(result_dataframe["delta"][:2].isnull().all())
+        self.assertListEqual(list(result_dataframe["delta"][2:]), ["c", "d"])
+
+        # an int column missing from one input can't hold NaN, so it's upcast to float
+        dataframe_2 = dataframe_2.drop(columns=["charlie"])
+        result_dataframe = self._produce([dataframe_1, dataframe_2])
+        np.testing.assert_array_equal(
+            result_dataframe["charlie"].to_numpy(), [10.0, 20.0, np.nan, np.nan]
+        )
+        self.assertEqual(result_dataframe["charlie"].dtype, np.float64)
+
+    def test_union_categoricals(self) -> None:
+        dataframe_1 = container.DataFrame(
+            {
+                "d3mIndex": [1, 2],
+                "alpha": pd.Categorical(["a", "b"]),
+            },
+            generate_metadata=True,
+        )
+        dataframe_2 = container.DataFrame(
+            {
+                "d3mIndex": [3, 4],
+                "alpha": pd.Categorical(["c", "a"]),
+            },
+            generate_metadata=True,
+        )
+        result_dataframe = self._produce([dataframe_1, dataframe_2])
+
+        # inputs with different categories stay categorical, with combined categories
+        self.assertIsInstance(result_dataframe["alpha"].dtype, pd.CategoricalDtype)
+        self.assertListEqual(
+            list(result_dataframe["alpha"].cat.categories), ["a", "b", "c"]
+        )
+        self.assertListEqual(list(result_dataframe["alpha"]), ["a", "b", "c", "a"])
+        self.assertListEqual(list(dataframe_2["alpha"].cat.categories), ["a", "c"])
+
+    def test_arrow_backed(self) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+        # convert_dtypes only takes a dtype_backend from pandas 2.0 on
+        if not hasattr(pd, "ArrowDtype") or int(pd.__version__.split(".")[0]) < 2:
+            self.skipTest("arrow backed dtypes require pandas>=2.0")
+
+        dataframe_1 = container.DataFrame(
+            {"d3mIndex": [1, 2], "alpha": ["a", "b"], "bravo": [1.5, 2.5]},
+            generate_metadata=True,
+        )
+        dataframe_2 = container.DataFrame(
+            {"d3mIndex": [2, 3], "alpha": ["x", "c"], "bravo": [9.5, 3.5]},
+            generate_metadata=True,
+        )
+        expected = self._produce([dataframe_1, dataframe_2])
+        result_dataframe = self._produce(
+            [dataframe_1, dataframe_2], {"arrow_backed": True}
+        )
+
+        # same values as the numpy backed concat, held in arrow backed columns
+        self.assertListEqual(list(result_dataframe["d3mIndex"]), [1, 2, 3])
+        self.assertListEqual(
+            list(result_dataframe["alpha"]), list(expected["alpha"])
+        )
+        self.assertListEqual(
+            list(result_dataframe["bravo"]), list(expected["bravo"])
+        )
+        for dtype in result_dataframe.dtypes:
+            self.assertIsInstance(dtype, pd.ArrowDtype)
+
+    def test_dataset_inputs(self) -> None:
+        hyperparams_class = VCPrimitive.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        concat_prim = VCPrimitive(
+            hyperparams=hyperparams_class.defaults().replace(
+                {"remove_duplicate_rows": False}
+            )
+        )
+        dataset_1 = container.Dataset.load(
+            "file://{}".format(path.join(self._dataset_path_1, "datasetDoc.json"))
+        )
+        dataset_2 = container.Dataset.load(
+            "file://{}".format(path.join(self._dataset_path_2, "datasetDoc.json"))
+        )
+
+        # repeat calls with the same datasets reuse the resource lookup, and give the same
+        # result
+        inputs = container.List([dataset_1, dataset_2])
+        first = concat_prim.produce(inputs=inputs).value["learningData"]
+        self.assertIn(id(dataset_1), concat_prim._resource_ids)
+        second = concat_prim.produce(inputs=inputs).value["learningData"]
+        pd.testing.assert_frame_equal(pd.DataFrame(first), pd.DataFrame(second))
+        self.assertEqual(
+            first.shape[0], dataset_1["0"].shape[0] + dataset_2["0"].shape[0]
+        )
+
+        # the lookup is dropped along with its dataset
+        key = id(dataset_1)
+        del inputs, dataset_1
+        gc.collect()
+        self.assertNotIn(key, concat_prim._resource_ids)
+
+    def test_metadata_cache(self) -> None:
+        dataframe_1 = container.DataFrame(
+            {"d3mIndex": [1, 2], "alpha": ["a", "b"]}, generate_metadata=True
+        )
+        dataframe_2 = container.DataFrame(
+            {"d3mIndex": [3, 4, 5], "alpha": ["c", "d", "e"]}, generate_metadata=True
+        )
+        concat._METADATA_CACHE.clear()
+
+        # the same schema reuses the cached metadata, with the length of each output
+        for inputs, length in [
+            ([dataframe_1, dataframe_2], 5),
+            ([dataframe_1], 2),
+            ([dataframe_2, dataframe_1, dataframe_2], 5),
+        ]:
+            result = self._produce_dataset(inputs)
+            self.assertEqual(result["learningData"].shape[0], length)
+            self.assertEqual(
+                result.metadata.query(("learningData",))["dimension"]["length"], length
+            )
+            self.assertEqual(len(concat._METADATA_CACHE), 1)
+
+        # the cache only holds the most recently used schemas
+        for i in range(concat._METADATA_CACHE_SIZE + 5):
+            dataframe = container.DataFrame(
+                {"d3mIndex": [1], "column_" + str(i): [1.0]}, generate_metadata=True
+            )
+            self._produce_dataset([dataframe])
+        self.assertEqual(len(concat._METADATA_CACHE), concat._METADATA_CACHE_SIZE)
+
+    def _produce(
+        self, inputs: typing.Sequence[container.DataFrame], params: dict = {}
+    ) -> container.DataFrame:
+        return self._produce_dataset(inputs, params)["learningData"]
+
+    def _produce_dataset(
+        self, inputs: typing.Sequence[container.DataFrame], params: dict = {}
+    ) -> container.Dataset:
+        hyperparams_class = VCPrimitive.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        concat_prim = VCPrimitive(
+            hyperparams=hyperparams_class.defaults().replace(params)
+        )
+        return concat_prim.produce(inputs=container.List(inputs)).value
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -15,9 +15,13 @@
 
 import unittest
 from os import path
+from unittest import mock
 import numpy as np
+import pandas as pd
+import haversine as hs
+from rapidfuzz import fuzz, process, utils as fuzz_utils
 
-from d3m import container
+from d3m import container, exceptions
 from distil.primitives.column_parser import ColumnParserPrimitive
 from distil_primitives_contrib.fuzzy_join import FuzzyJoinPrimitive as FuzzyJoin
 from d3m.metadata import base as metadata_base
@@ -711,6 +715,375 @@ class FuzzyJoinPrimitiveTestCase(unittest.TestCase):
             ],
         )
 
+    def test_string_merge_cols(self) -> None:
+        right_df = pd.DataFrame(
+            {"alpha": ["yankee", "hotel", "foxtrot", "golf", "Yankee Doodle"]}
+        )
+        # mostly duplicated keys are matched once per distinct key, and mostly unique keys are
+        # matched row by row
+        for left_values in [
+            [
+                "yankee",
+                "yankeee",
+                "yankee",
+                "hotel",
+                "hotel",
+                "otel",
+                "yankee",
+                "golf",
+            ],
+            [
+                "yankee",
+                "yankeee",
+                "yank",
+                "Hotel",
+                "hotel",
+                "otel",
+                "foxtrot aa",
+                "gulf",
+            ],
+        ]:
+            left_df = pd.DataFrame({"alpha": left_values})
+            expected = self._baseline_string_match(left_values, right_df["alpha"], 0.9)
+
+            # a tile size smaller than the number of keys scores them over several tiles
+            for tile_size in [4096, 2]:
+                with mock.patch.object(FuzzyJoin, "_MATCH_TILE_SIZE", tile_size):
+                    result = FuzzyJoin._create_string_merge_cols(
+                        left_df, "alpha", right_df, "alpha", 0.9, 0
+                    )
+                self.assertListEqual(list(result.columns), ["lefty_string0"])
+                self.assertTrue(
+                    self.assertNumpyListEqual(list(result["lefty_string0"]), expected)
+                )
+
+    def test_numeric_fuzzy_match(self) -> None:
+        rng = np.random.RandomState(0)
+        matches = rng.uniform(-100.0, 100.0, 500)
+        choices = rng.uniform(-100.0, 100.0, 50)
+        for accuracy, is_absolute in [
+            (0.9, False),
+            (0.99, False),
+            (1.5, True),
+            (0.0, True),
+        ]:
+            expected = [
+                self._baseline_numeric_match(m, choices, accuracy, is_absolute)
+                for m in matches
+            ]
+            result = FuzzyJoin._numeric_fuzzy_match(
+                matches, choices, accuracy, is_absolute
+            )
+            np.testing.assert_array_equal(result, expected)
+
+        # exact values are matched with an absolute tolerance of 0
+        np.testing.assert_array_equal(
+            FuzzyJoin._numeric_fuzzy_match([1.0, 2.5, 4.0], [4.0, 1.0], 0.0, True),
+            [1.0, np.nan, 4.0],
+        )
+
+    def test_geo_fuzzy_match(self) -> None:
+        rng = np.random.RandomState(0)
+        choices = rng.uniform(-10.0, 10.0, (40, 2, 2))
+        # half the matches are close to a choice, the rest are random
+        matches = np.concatenate(
+            [
+                choices[rng.randint(0, 40, 30)] + rng.normal(0.0, 0.01, (30, 2, 2)),
+                rng.uniform(-10.0, 10.0, (30, 2, 2)),
+            ]
+        )
+        expected = [self._baseline_geo_match(m, choices, 5000.0) for m in matches]
+
+        for tile_size in [4096, 7]:
+            with mock.patch.object(FuzzyJoin, "_MATCH_TILE_SIZE", tile_size):
+                result = FuzzyJoin._geo_fuzzy_match(matches, choices, 5000.0, True)
+            self.assertListEqual(list(result), expected)
+
+        with self.assertRaises(exceptions.InvalidArgumentTypeError):
+            FuzzyJoin._geo_fuzzy_match(matches, choices, 0.9, False)
+
+    def test_vector_fuzzy_match(self) -> None:
+        rng = np.random.RandomState(0)
+        # cover both the brute force and the KD tree paths
+        for n_choices in [20, FuzzyJoin._SMALL_CHOICE_COUNT + 50]:
+            choices = rng.uniform(0.0, 100.0, (n_choices, 3))
+            matches = np.concatenate(
+                [
+                    choices[rng.randint(0, n_choices, 40)]
+                    + rng.uniform(-0.5, 0.5, (40, 3)),
+                    rng.uniform(0.0, 100.0, (40, 3)),
+                ]
+            )
+            matches[0, 1] = np.nan
+            for accuracy, is_absolute in [(1.0, True), (0.98, False)]:
+                expected = np.array(
+                    [
+                        self._reference_vector_match(m, choices, accuracy, is_absolute)
+                        for m in matches
+                    ]
+                )
+                result = FuzzyJoin._vector_fuzzy_match(
+                    matches, choices, accuracy, is_absolute
+                )
+                np.testing.assert_array_equal(result, expected)
+                self.assertTrue(np.isnan(result[0]).all())
+
+    def test_exact_join(self) -> None:
+        left_df = container.DataFrame(
+            {
+                "alpha": ["yankee", "hotel", "golf", "yankee"],
+                "bravo": [1.0, 2.0, 3.0, 4.0],
+            }
+        )
+        right_df = container.DataFrame(
+            {"alpha": ["hotel", "yankee", "foxtrot"], "charlie": [100.0, 200.0, 300.0]}
+        )
+        hyperparams_class = FuzzyJoin.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        fuzzy_join = FuzzyJoin(hyperparams=hyperparams_class.defaults())
+
+        for join_type, column, accuracy, is_absolute in [
+            ("http://schema.org/Text", "alpha", 1.0, False),
+            ("http://schema.org/Float", "bravo", 0.0, True),
+        ]:
+            if column == "bravo":
+                right = right_df.rename(columns={"charlie": "bravo"})
+            else:
+                right = right_df
+            self.assertTrue(
+                FuzzyJoin._is_exact_join(
+                    [join_type], left_df[column], right[column], accuracy, is_absolute
+                )
+            )
+
+            # the exact join merges on the original columns, and has to give the same result
+            # as going through the fuzzy matching
+            args = {
+                "join_types": [[join_type]],
+                "left_col": [column],
+                "right_col": [column],
+                "accuracy": [accuracy],
+                "absolute_accuracy": [is_absolute],
+                "datetime_tolerances": [None],
+            }
+            exact = fuzzy_join._produce(
+                left_df=left_df.copy(), right_df=right.copy(), **args
+            )
+            with mock.patch.object(FuzzyJoin, "_is_exact_join", return_value=False):
+                fuzzy = fuzzy_join._produce(
+                    left_df=left_df.copy(), right_df=right.copy(), **args
+                )
+            pd.testing.assert_frame_equal(
+                pd.DataFrame(exact), pd.DataFrame(fuzzy), check_dtype=False
+            )
+
+        # fuzzy accuracies aren't exact
+        self.assertFalse(
+            FuzzyJoin._is_exact_join(
+                ["http://schema.org/Text"],
+                left_df["alpha"],
+                right_df["alpha"],
+                0.9,
+                False,
+            )
+        )
+
+    def test_datetime_merge_cols(self) -> None:
+        left_df = pd.DataFrame(
+            {
+                "sierra": [
+                    "2019-01-21 10:54:21",
+                    "2019-01-21 10:55:50",
+                    "2019-01-21 11:30:00",
+                    "not a date",
+                ]
+            }
+        )
+        right_df = pd.DataFrame(
+            {
+                "tango": [
+                    "2019-01-21 10:54:21",
+                    "2019-01-21 10:56:00",
+                    "2019-01-21 10:59:21",
+                ]
+            }
+        )
+        # unparseable values are NaT rather than an error
+        right_keys = FuzzyJoin._parse_datetimes(right_df["tango"])
+        left_keys = FuzzyJoin._parse_datetimes(left_df["sierra"])
+        self.assertTrue(np.isnat(left_keys[3]))
+
+        for seconds in [0, 30, 600]:
+            tolerance = np.timedelta64(seconds, "s")
+            new_left_df, new_right_df = FuzzyJoin._create_datetime_merge_cols(
+                left_df, "sierra", right_df, "tango", tolerance, 0
+            )
+            expected = [
+                self._baseline_datetime_match(dt, np.unique(right_keys), tolerance)
+                for dt in left_keys
+            ]
+            np.testing.assert_array_equal(
+                new_left_df["lefty_datetime0"].to_numpy(dtype="datetime64[ns]"),
+                np.array(expected, dtype="datetime64[ns]"),
+            )
+            np.testing.assert_array_equal(
+                new_right_df["righty_datetime0"].to_numpy(dtype="datetime64[ns]"),
+                right_keys,
+            )
+
+    def test_parse_datetimes(self) -> None:
+        parsed = FuzzyJoin._parse_datetimes(
+            pd.Series(["Jan 21 2019 10:54:21", "Jan 22 2019 00:00:00", "bad"])
+        )
+        np.testing.assert_array_equal(
+            parsed,
+            np.array(
+                ["2019-01-21T10:54:21", "2019-01-22T00:00:00", "NaT"],
+                dtype="datetime64[ns]",
+            ),
+        )
+
+        # timezone aware values are compared in UTC
+        parsed = FuzzyJoin._parse_datetimes(
+            pd.Series(["2019-01-21T10:54:21+02:00", "2019-01-21T08:54:21+00:00"])
+        )
+        self.assertEqual(parsed[0], parsed[1])
+
+    def test_vector_matrix(self) -> None:
+        # string and array vectors parse to the same matrix
+        expected = [[10.0, 20.0], [5.0, 3.2]]
+        self.assertListEqual(
+            FuzzyJoin._to_vector_matrix(pd.Series(["10,20", "5, 3.2"])).tolist(),
+            expected,
+        )
+        self.assertListEqual(
+            FuzzyJoin._to_vector_matrix(
+                pd.Series([np.array([10.0, 20.0]), np.array([5.0, 3.2])])
+            ).tolist(),
+            expected,
+        )
+
+    def test_vector_matrix_ragged(self) -> None:
+        # vectors of different lengths can't be laid out as a matrix, even when the total number
+        # of values would divide evenly into rows
+        for vectors in [
+            ["10,20", "5"],
+            ["10", "20,5,3"],
+            ["10", ""],
+            ["10,20", np.nan],
+            [np.array([10.0, 20.0]), np.array([5.0])],
+        ]:
+            with self.assertRaises(exceptions.InvalidArgumentValueError):
+                FuzzyJoin._to_vector_matrix(pd.Series(vectors, name="gamma"))
+
+    def test_joined_metadata(self) -> None:
+        dataframe_1 = self._load_data(self._dataset_path_1)
+        dataframe_2 = self._load_data(self._dataset_path_2)
+
+        hyperparams_class = FuzzyJoin.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        hyperparams = hyperparams_class.defaults().replace(
+            {
+                "left_col": "alpha",
+                "right_col": "alpha",
+                "accuracy": 0.9,
+            }
+        )
+        fuzzy_join = FuzzyJoin(hyperparams=hyperparams)
+        result_dataset = fuzzy_join.produce(left=dataframe_1, right=dataframe_2).value
+        result_dataframe = result_dataset["0"]
+
+        # metadata generated over the whole joined dataset is the baseline to check against
+        expected = container.Dataset(
+            {"0": result_dataframe.head(1)}, generate_metadata=True
+        ).metadata
+        expected = expected.update(
+            ("0",), {"dimension": {"length": result_dataframe.shape[0]}}
+        )
+
+        # verify the dataset root still describes the dataset, not the joined resource
+        root = result_dataset.metadata.query(())
+        self.assertEqual(root["structural_type"], container.Dataset)
+        self.assertEqual(root["dimension"], expected.query(())["dimension"])
+        self.assertNotIn(
+            "name", result_dataset.metadata.query((metadata_base.ALL_ELEMENTS, 0))
+        )
+
+        # verify the resource metadata matches the baseline
+        resource = result_dataset.metadata.query(("0",))
+        self.assertEqual(
+            resource["structural_type"], expected.query(("0",))["structural_type"]
+        )
+        self.assertEqual(resource["dimension"], expected.query(("0",))["dimension"])
+        for i, column in enumerate(result_dataframe.columns):
+            self.assertEqual(
+                result_dataset.metadata.query(
+                    ("0", metadata_base.ALL_ELEMENTS, i)
+                )["name"],
+                column,
+            )
+
+    @classmethod
+    def _baseline_string_match(cls, matches, choices, accuracy):
+        # best scoring choice for each key, one key at a time
+        choices = choices.unique()
+        result = []
+        for match in matches:
+            choice, score, _ = process.extractOne(
+                match, choices, scorer=fuzz.WRatio, processor=fuzz_utils.default_process
+            )
+            result.append(choice if score >= accuracy * 100 else np.nan)
+        return result
+
+    @classmethod
+    def _baseline_numeric_match(cls, match, choices, accuracy, is_absolute):
+        # nearest choice within the tolerance, checking every choice
+        tolerance = accuracy if is_absolute else abs(match) * (1.0 - accuracy)
+        distances = np.abs(choices - match)
+        nearest = distances.argmin()
+        return choices[nearest] if distances[nearest] <= tolerance else np.nan
+
+    @classmethod
+    def _baseline_geo_match(cls, match, choices, accuracy):
+        # first choice with every point within the tolerance of the matching point
+        for i, choice in enumerate(choices):
+            if all(
+                hs.haversine(tuple(match[p]), tuple(choice[p]), hs.Unit.METERS)
+                < accuracy
+                for p in range(match.shape[0])
+            ):
+                return i
+        return -1
+
+    @classmethod
+    def _reference_vector_match(cls, match, choices, accuracy, is_absolute):
+        # nearest choice by the largest per dimension difference, checking every choice
+        if not np.isfinite(match).all():
+            return np.full(match.shape, np.nan)
+        nearest = choices[np.abs(choices - match).max(axis=1).argmin()]
+        tolerance = accuracy if is_absolute else np.abs(match) * (1.0 - accuracy)
+        if (np.abs(nearest - match) <= tolerance).all():
+            return nearest
+        return np.full(match.shape, np.nan)
+
+    @classmethod
+    def _baseline_datetime_match(cls, match, choices, tolerance):
+        # nearest date within the tolerance, checking every date
+        if np.isnat(match):
+            return np.datetime64("NaT")
+        min_distance = None
+        min_date = np.datetime64("NaT")
+        for date in choices:
+            distance = abs(match - date)
+            if distance <= tolerance and (
+                min_distance is None or distance < min_distance
+            ):
+                min_distance = distance
+                min_date = date
+        return min_date
+
     def _load_data(cls, dataset_path: str) -> container.DataFrame:
         dataset_doc_path = path.join(dataset_path, "datasetDoc.json")
 
@@ -15,6 +15,10 @@
 
 import unittest
 from os import path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
 
 from distil_primitives_contrib.isolation_forest import IsolationForestPrimitive
 import utils as test_utils
@@ -45,6 +49,68 @@ class IsolationForestPrimitiveTestCase(unittest.TestCase):
             list(results["outlier_label"]), [-1, -1, -1, -1, -1, -1, -1, -1, -1]
         )
 
+    def test_repeat_produce(self) -> None:
+        dataset = test_utils.load_dataset(self._dataset_path)
+        dataframe = test_utils.get_dataframe(dataset, "learningData")
+        dataframe.drop(columns=["delta", "echo"], inplace=True)
+        inputs = dataframe[["alpha", "bravo"]].astype(float)
+
+        hyperparams_class = IsolationForestPrimitive.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        hyperparams = hyperparams_class.defaults().replace({"n_jobs": -1})
+
+        isp = IsolationForestPrimitive(hyperparams=hyperparams)
+        isp.set_training_data(inputs=inputs)
+        isp.fit()
+
+        with mock.patch.object(
+            isp._model, "predict", wraps=isp._model.predict
+        ) as predict:
+            first = isp.produce(inputs=inputs).value
+            second = isp.produce(inputs=inputs.copy()).value
+
+            # the repeat call with equal inputs is served from the last result
+            self.assertEqual(predict.call_count, 1)
+            self.assertListEqual(
+                list(first["outlier_label"]), list(second["outlier_label"])
+            )
+
+            # changed values are predicted again
+            changed = isp.produce(inputs=inputs.head(3)).value
+            self.assertEqual(predict.call_count, 2)
+            self.assertEqual(changed.shape[0], 3)
+
+            # so are equal values with different dtypes
+            isp.produce(inputs=inputs.astype(np.float32))
+            self.assertEqual(predict.call_count, 3)
+
+        # setting new params drops the cached result
+        isp.produce(inputs=inputs)
+        isp.set_params(params=isp.get_params())
+        with mock.patch.object(
+            isp._model, "predict", wraps=isp._model.predict
+        ) as predict:
+            isp.produce(inputs=inputs)
+            self.assertEqual(predict.call_count, 1)
+
+    def test_inputs_key(self) -> None:
+        inputs = pd.DataFrame({"alpha": [1.0, 2.0, 3.0], "bravo": [1.0, 2.0, 3.0]})
+        key = IsolationForestPrimitive._hash_inputs(inputs)
+
+        # equal values give the same key, whatever the index
+        reindexed = inputs.set_index(inputs.index + 5)
+        self.assertEqual(key, IsolationForestPrimitive._hash_inputs(reindexed))
+
+        # the same values under a different schema don't
+        for changed in [
+            inputs.rename(columns={"alpha": "charlie"}),
+            inputs[["bravo", "alpha"]],
+            inputs.astype(np.float32),
+            inputs.assign(alpha=[1.0, 2.0, 4.0]),
+        ]:
+            self.assertNotEqual(key, IsolationForestPrimitive._hash_inputs(changed))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -33,6 +33,20 @@ class MIRankingPrimitiveTestCase(unittest.TestCase):
 
     _dataset_path = path.abspath(path.join(path.dirname(__file__), "tabular_dataset_2"))
 
+    @classmethod
+    def setUpClass(cls) -> None:
+        dataset_doc_path = path.join(cls._dataset_path, "datasetDoc.json")
+
+        # load the dataset and convert resource 0 to a dataframe once - each test works on its
+        # own copy
+        dataset = container.Dataset.load(
+            "file://{dataset_doc_path}".format(dataset_doc_path=dataset_doc_path)
+        )
+        cls._base_dataframe = dataset["learningData"]
+        cls._base_dataframe.metadata = cls._base_dataframe.metadata.generate(
+            cls._base_dataframe
+        )
+
     def test_discrete_target(self) -> None:
         dataframe = self._load_data()
 
@@ -94,6 +108,101 @@ class MIRankingPrimitiveTestCase(unittest.TestCase):
         for i, r in enumerate(result_dataframe["rank"]):
             self.assertAlmostEqual(r, expected_ranks[i], places=6)
 
+    def test_continuous_target_single_job(self) -> None:
+        dataframe = self._load_data()
+
+        hyperparams_class = MIRanking.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        hyperparams = hyperparams_class.defaults().replace(
+            {"target_col_index": 2, "n_jobs": 1}
+        )
+        mi_ranking = MIRanking(hyperparams=hyperparams)
+        result_dataframe = mi_ranking.produce(inputs=dataframe).value
+
+        # verify the output matches the parallel run
+        self.assertListEqual(list(result_dataframe["idx"]), [1, 5, 4, 3])
+        expected_ranks = [1.0, 0.930536, 7.316753e-16, 0.0]
+        for i, r in enumerate(result_dataframe["rank"]):
+            self.assertAlmostEqual(r, expected_ranks[i], places=6)
+
+    def test_continuous_target_top_k(self) -> None:
+        dataframe = self._load_data()
+
+        hyperparams_class = MIRanking.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        hyperparams = hyperparams_class.defaults().replace(
+            {"target_col_index": 2, "top_k": 2}
+        )
+        mi_ranking = MIRanking(hyperparams=hyperparams)
+        result_dataframe = mi_ranking.produce(inputs=dataframe).value
+
+        # verify only the two best features are returned
+        self.assertListEqual(list(result_dataframe["idx"]), [1, 5])
+        self.assertListEqual(list(result_dataframe["name"]), ["alpha", "echo"])
+        expected_ranks = [1.0, 0.930536]
+        for i, r in enumerate(result_dataframe["rank"]):
+            self.assertAlmostEqual(r, expected_ranks[i], places=6)
+
+    def test_top_k_bounds(self) -> None:
+        dataframe = self._load_data()
+
+        hyperparams_class = MIRanking.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        defaults = hyperparams_class.defaults().replace({"target_col_index": 2})
+
+        # k has to be at least 1
+        for top_k in [0, -1]:
+            with self.assertRaises(ValueError):
+                defaults.replace({"top_k": top_k})
+
+        # a k of 1 keeps just the best feature, and a k past the feature count keeps them all
+        for top_k, expected_idx in [(1, [1]), (4, [1, 5, 4, 3]), (10, [1, 5, 4, 3])]:
+            mi_ranking = MIRanking(hyperparams=defaults.replace({"top_k": top_k}))
+            result_dataframe = mi_ranking.produce(inputs=dataframe).value
+            self.assertListEqual(list(result_dataframe["idx"]), expected_idx)
+
+    def test_continuous_target_histogram(self) -> None:
+        dataframe = self._load_data()
+
+        hyperparams_class = MIRanking.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        hyperparams = hyperparams_class.defaults().replace(
+            {"target_col_index": 2, "estimator": "histogram"}
+        )
+        mi_ranking = MIRanking(hyperparams=hyperparams)
+        result_dataframe = mi_ranking.produce(inputs=dataframe).value
+
+        # verify the output
+        self.assertListEqual(list(result_dataframe["idx"]), [1, 5, 3, 4])
+        self.assertListEqual(
+            list(result_dataframe["name"]), ["alpha", "echo", "charlie", "delta"]
+        )
+        expected_ranks = [1.0, 0.720850, 0.049042, 7.316753e-16]
+        for i, r in enumerate(result_dataframe["rank"]):
+            self.assertAlmostEqual(r, expected_ranks[i], places=6)
+
+    def test_constant_target_histogram(self) -> None:
+        dataframe = self._load_data()
+        dataframe["bravo"] = 1.0
+
+        hyperparams_class = MIRanking.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        hyperparams = hyperparams_class.defaults().replace(
+            {"target_col_index": 2, "estimator": "histogram"}
+        )
+        mi_ranking = MIRanking(hyperparams=hyperparams)
+        result_dataframe = mi_ranking.produce(inputs=dataframe).value
+
+        # a target with a single bin carries no information, so every numeric feature ranks 0
+        ranks = dict(zip(result_dataframe["name"], result_dataframe["rank"]))
+        for name in ["alpha", "charlie", "echo"]:
+            self.assertEqual(ranks[name], 0.0)
+
     def test_continuous_target_string_categorical(self) -> None:
         dataframe = self._load_data()
         dataframe.metadata = dataframe.metadata.update(
@@ -177,6 +286,22 @@ class MIRankingPrimitiveTestCase(unittest.TestCase):
             list(result_dataframe["name"]), ["bravo", "echo", "delta", "charlie"]
         )
 
+    def test_constant_feature_ranked_zero(self) -> None:
+        dataframe = self._load_data()
+        dataframe["charlie"] = 1
+
+        hyperparams_class = MIRanking.metadata.query()["primitive_code"][
+            "class_type_arguments"
+        ]["Hyperparams"]
+        hyperparams = hyperparams_class.defaults().replace({"target_col_index": 1})
+        mi_ranking = MIRanking(hyperparams=hyperparams)
+        result_dataframe = mi_ranking.produce(inputs=dataframe).value
+
+        # verify the constant column is still reported, with a rank of 0
+        self.assertSetEqual(set(result_dataframe["idx"]), {2, 3, 4, 5})
+        self.assertEqual(result_dataframe["name"].iloc[-1], "charlie")
+        self.assertEqual(result_dataframe["rank"].iloc[-1], 0.0)
+
     # def test_acled(self) -> None:
     #     dataset = test_utils.load_dataset('/Users/vkorapaty/data/datasets/seed_datasets_current/LL0_acled_reduced_MIN_METADATA/LL0_acled_reduced_MIN_METADATA')
 
@@ -238,92 +363,80 @@ class MIRankingPrimitiveTestCase(unittest.TestCase):
     def _load_data(
         cls, bad_features: typing.Sequence[int] = [], alpha_class=int, charlie_class=int
     ) -> container.DataFrame:
-        dataset_doc_path = path.join(cls._dataset_path, "datasetDoc.json")
-
-        # load the dataset and convert resource 0 to a dataframe
-        dataset = container.Dataset.load(
-            "file://{dataset_doc_path}".format(dataset_doc_path=dataset_doc_path)
-        )
-        dataframe = dataset["learningData"]
-        dataframe.metadata = dataframe.metadata.generate(dataframe)
-
-        # set the struct type
-        dataframe.metadata = dataframe.metadata.update(
-            (metadata_base.ALL_ELEMENTS, 0), {"structural_type": int}
-        )
-        dataframe.metadata = dataframe.metadata.update(
-            (metadata_base.ALL_ELEMENTS, 1), {"structural_type": alpha_class}
-        )
-        dataframe.metadata = dataframe.metadata.update(
-            (metadata_base.ALL_ELEMENTS, 2), {"structural_type": float}
-        )
-        dataframe.metadata = dataframe.metadata.update(
-            (metadata_base.ALL_ELEMENTS, 3), {"structural_type": charlie_class}
-        )
-        dataframe.metadata = dataframe.metadata.update(
-            (metadata_base.ALL_ELEMENTS, 4), {"structural_type": str}
-        )
-        dataframe.metadata = dataframe.metadata.update(
-            (metadata_base.ALL_ELEMENTS, 5), {"structural_type": int}
-        )
-
-        # set the semantic type
+        # metadata is immutable, so the copy can share the base dataframe's
+        dataframe = cls._base_dataframe.copy(deep=True)
+        dataframe.metadata = cls._base_dataframe.metadata
+
+        # work out each column's structural type and added semantic types, and then apply them
+        # with a single metadata update per column
+        structural_types = {
+            0: int,
+            1: alpha_class,
+            2: float,
+            3: charlie_class,
+            4: str,
+            5: int,
+        }
+        added_semantic_types: typing.Dict[int, typing.List[str]] = {
+            1: [],
+            2: ["http://schema.org/Float"],
+            3: [],
+            4: ["http://schema.org/Text"],
+            5: ["http://schema.org/Integer"],
+        }
         if alpha_class == int:
-            dataframe.metadata = dataframe.metadata.add_semantic_type(
-                (metadata_base.ALL_ELEMENTS, 1),
-                "https://metadata.datadrivendiscovery.org/types/CategoricalData",
+            added_semantic_types[1].append(
+                "https://metadata.datadrivendiscovery.org/types/CategoricalData"
             )
         elif alpha_class == float:
-            dataframe.metadata = dataframe.metadata.add_semantic_type(
-                (metadata_base.ALL_ELEMENTS, 1), "http://schema.org/Float"
-            )
-
-        dataframe.metadata = dataframe.metadata.add_semantic_type(
-            (metadata_base.ALL_ELEMENTS, 2), "http://schema.org/Float"
-        )
+            added_semantic_types[1].append("http://schema.org/Float")
         if charlie_class == int:
-            dataframe.metadata = dataframe.metadata.add_semantic_type(
-                (metadata_base.ALL_ELEMENTS, 3), "http://schema.org/Boolean"
-            )
+            added_semantic_types[3].append("http://schema.org/Boolean")
         elif charlie_class == float:
-            dataframe.metadata = dataframe.metadata.add_semantic_type(
-                (metadata_base.ALL_ELEMENTS, 3), "http://schema.org/Float"
-            )
-        dataframe.metadata = dataframe.metadata.add_semantic_type(
-            (metadata_base.ALL_ELEMENTS, 4), "http://schema.org/Text"
-        )
-        dataframe.metadata = dataframe.metadata.add_semantic_type(
-            (metadata_base.ALL_ELEMENTS, 5), "http://schema.org/Integer"
-        )
+            added_semantic_types[3].append("http://schema.org/Float")
 
         # override with incompatible features
         for i in bad_features:
-            dataframe.metadata = dataframe.metadata.update(
-                (metadata_base.ALL_ELEMENTS, i), {"structural_type": str}
-            )
-        for i in bad_features:
+            structural_types[i] = str
+
+        for i, structural_type in structural_types.items():
+            if i in bad_features:
+                semantic_types = ["http://schema.org/Text"]
+            else:
+                semantic_types = list(
+                    dataframe.metadata.query_column(i).get("semantic_types", ())
+                )
+                semantic_types += added_semantic_types.get(i, [])
+            # set the roles
+            if i > 0:
+                semantic_types.append(
+                    "https://metadata.datadrivendiscovery.org/types/Attribute"
+                )
             dataframe.metadata = dataframe.metadata.update(
                 (metadata_base.ALL_ELEMENTS, i),
-                {"semantic_types": ["http://schema.org/Text"]},
+                {
+                    "structural_type": structural_type,
+                    "semantic_types": list(dict.fromkeys(semantic_types)),
+                },
             )
 
-        # set the roles
-        for i in range(1, 6):
-            dataframe.metadata = dataframe.metadata.add_semantic_type(
-                (metadata_base.ALL_ELEMENTS, i),
-                "https://metadata.datadrivendiscovery.org/types/Attribute",
+        # handle the missing data as a NaN - only string columns can hold blanks
+        for column in dataframe.select_dtypes(include="object"):
+            dataframe[column] = dataframe[column].where(
+                dataframe[column].str.strip() != "", np.nan
             )
 
-        # handle the missing data as a NaN
-        dataframe = dataframe.replace(r"^\s*$", np.nan, regex=True)
-
         # cast the dataframe to raw python types
-        dataframe["d3mIndex"] = dataframe["d3mIndex"].astype(int)
-        dataframe["alpha"] = dataframe["alpha"].astype(alpha_class)
-        dataframe["bravo"] = dataframe["bravo"].astype(float)
-        dataframe["charlie"] = dataframe["charlie"].astype(alpha_class)
-        dataframe["delta"] = dataframe["delta"].astype(str)
-        dataframe["echo"] = dataframe["echo"].astype(float)
+        dataframe = dataframe.astype(
+            {
+                "d3mIndex": int,
+                "alpha": alpha_class,
+                "bravo": float,
+                "charlie": alpha_class,
+                "delta": str,
+                "echo": float,
+            }
+        )
 
         return dataframe
 
@@ -0,0 +1,112 @@
+#
+#   Copyright © 2021 Uncharted Software Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import math
+import unittest
+import numpy as np
+
+from d3m import container
+from d3m.metadata import base as metadata_base
+from distil_primitives_contrib.prefeaturised_pooler import (
+    PrefeaturisedPoolingPrimitive,
+)
+
+
+class PrefeaturisedPoolingPrimitiveTestCase(unittest.TestCase):
+
+    _height = 2
+    _width = 2
+
+    def test_pooled_features(self) -> None:
+        features = self._features(5)
+
+        # a batch size that doesn't divide the row count leaves a short final batch
+        for batch_size in [2, 256]:
+            outputs = self._produce(features, batch_size)
+
+            self.assertEqual(outputs.shape, (5, 2048))
+            self.assertEqual(outputs.dtypes.iloc[0], np.float32)
+            np.testing.assert_allclose(
+                outputs.to_numpy(),
+                self._baseline_pool(features, batch_size),
+                rtol=1e-4,
+            )
+
+    def test_metadata(self) -> None:
+        outputs = self._produce(self._features(5), 2)
+
+        self.assertEqual(outputs.metadata.query(())["dimension"]["length"], 5)
+        self.assertListEqual(
+            outputs.metadata.list_columns_with_semantic_types(
+                ("http://schema.org/Float",)
+            ),
+            list(range(2048)),
+        )
+
+    def _features(self, rows: int) -> np.ndarray:
+        # non-negative activations with some zeros, like the unpooled remote sensing outputs
+        rng = np.random.default_rng(0)
+        features = rng.random((rows, 2048 * self._height * self._width))
+        features[features < 0.3] = 0.0
+        return features
+
+    def _produce(self, features: np.ndarray, batch_size: int) -> container.DataFrame:
+        inputs = container.DataFrame(features, generate_metadata=True)
+        inputs.metadata = inputs.metadata.add_semantic_type(
+            (metadata_base.ALL_ELEMENTS, metadata_base.ALL_ELEMENTS),
+            "http://schema.org/Float",
+        )
+
+        hyperparams_class = PrefeaturisedPoolingPrimitive.metadata.query()[
+            "primitive_code"
+        ]["class_type_arguments"]["Hyperparams"]
+        pooler = PrefeaturisedPoolingPrimitive(
+            hyperparams=hyperparams_class.defaults().replace(
+                {
+                    "batch_size": batch_size,
+                    "height": self._height,
+                    "width": self._width,
+                }
+            )
+        )
+        return pooler.produce(inputs=inputs).value
+
+    @classmethod
+    def _baseline_pool(cls, features: np.ndarray, batch_size: int) -> np.ndarray:
+        # the original double precision pooling, one batch at a time
+        features = features.reshape(features.shape[0], 2048, cls._height, cls._width)
+        all_img_features = []
+        for i in range(math.ceil(features.shape[0] / batch_size)):
+            batch = features[i * batch_size : (i + 1) * batch_size]
+            spatial_weight = batch.sum(axis=1, keepdims=True)
+            z = (spatial_weight ** 2.0).sum(axis=(2, 3), keepdims=True)
+            z = z ** (1.0 / 2.0)
+            spatial_weight = (spatial_weight / z) ** (1.0 / 2.0)
+
+            _, c, w, h = batch.shape
+            nonzeros = (batch != 0).astype(float).sum(axis=(2, 3)) / 1.0 / (
+                w * h
+            ) + 1e-6
+            channel_weight = np.log(nonzeros.sum(axis=1, keepdims=True) / nonzeros)
+
+            batch = batch * spatial_weight
+            batch = batch.sum(axis=(2, 3))
+            batch = batch * channel_weight
+            all_img_features.append(batch)
+        return np.vstack(all_img_features)
+
+
+if __name__ == "__main__":
+    unittest.main()